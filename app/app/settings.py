@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     "rest_framework",
     "rest_framework.authtoken",
@@ -85,16 +86,83 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# DB_POOL_MODE=pgbouncer targets a transaction pooling pgbouncer, which
+# can't hold server-side cursors open between transactions.
+DB_POOL_MODE = os.environ.get("DB_POOL_MODE", "direct")
+
+# APP_SERVER=asgi runs app.asgi under gunicorn's uvicorn workers (see
+# scripts/run.sh). Django runs each request's sync code on its own
+# thread there, so connections can't be reused across requests.
+APP_SERVER = os.environ.get("APP_SERVER", "uwsgi")
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
         "HOST": os.environ.get("DB_HOST"),
+        "PORT": os.environ.get("DB_PORT", ""),
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASS"),
+        "CONN_MAX_AGE": 0 if APP_SERVER == "asgi" else int(
+            os.environ.get("DB_CONN_MAX_AGE", 60)
+        ),
+        "DISABLE_SERVER_SIDE_CURSORS": DB_POOL_MODE == "pgbouncer",
+    }
+}
+
+DB_HEALTH_CHECK_INTERVAL = int(os.environ.get("DB_HEALTH_CHECK_INTERVAL", 30))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_LOCATION", "/vol/cache"),
+    },
+    "redis": {
+        "BACKEND": "core.cache.RedisCache",
+        "LOCATION": os.environ.get("CACHE_LOCATION", "redis://redis:6379/0"),
+        "OPTIONS": {
+            "CLIENT_CLASS": os.environ.get("CACHE_CLIENT_CLASS", "redis.Redis"),
+        },
+    },
+}
+
+CACHES = {
+    "default": {
+        **CACHE_BACKENDS[os.environ.get("CACHE_BACKEND") or "locmem"],
+        "KEY_PREFIX": "app",
+        "TIMEOUT": int(os.environ.get("CACHE_TIMEOUT", 300)),
     }
 }
 
+# Whether all app processes see the same default cache. Invalidations
+# made in one process can't reach another's locmem cache, so data that
+# must not go stale (token lookups, list validators) is only cached when
+# the cache is shared.
+CACHE_SHARED = (
+    CACHES["default"]["BACKEND"] != CACHE_BACKENDS["locmem"]["BACKEND"]
+)
+
+# How often each process logs its cache hits and misses, 0 for never.
+CACHE_METRICS_LOG_INTERVAL = int(
+    os.environ.get("CACHE_METRICS_LOG_INTERVAL", 300)
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "core.metrics": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -143,10 +211,72 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "core.User"
 
+# "orjson" uses core.renderers when orjson is installed, "stdlib" keeps
+# DRF's json based renderer and parser.
+API_JSON_BACKEND = os.environ.get("API_JSON_BACKEND", "orjson")
+API_JSON_CLASSES = {
+    "orjson": ("core.renderers.FastJSONRenderer", "core.renderers.FastJSONParser"),
+    "stdlib": ("rest_framework.renderers.JSONRenderer", "rest_framework.parsers.JSONParser"),
+}
+
 REST_FRAMEWORK = {
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema"
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        API_JSON_CLASSES[API_JSON_BACKEND][0],
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        API_JSON_CLASSES[API_JSON_BACKEND][1],
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+TOKEN_CACHE_ALIAS = "default"
+TOKEN_CACHE_TIMEOUT = int(os.environ.get("TOKEN_CACHE_TIMEOUT", 300))
+# Also how long a revoked token or deactivated user can keep
+# authenticating in processes other than the one that made the change.
+TOKEN_CACHE_LOCAL_TIMEOUT = int(os.environ.get("TOKEN_CACHE_LOCAL_TIMEOUT", 30))
+TOKEN_CACHE_LOCAL_SIZE = int(os.environ.get("TOKEN_CACHE_LOCAL_SIZE", 1024))
+
+RECIPE_LIST_CACHE = bool(int(os.environ.get("RECIPE_LIST_CACHE", 0)))
+RECIPE_PAGE_SIZE = int(os.environ.get("RECIPE_PAGE_SIZE", 100))
+RECIPE_MAX_PAGE_SIZE = int(os.environ.get("RECIPE_MAX_PAGE_SIZE", 1000))
+RECIPE_BULK_MAX_ITEMS = int(os.environ.get("RECIPE_BULK_MAX_ITEMS", 5000))
+RECIPE_SEARCH_CONFIG = os.environ.get("RECIPE_SEARCH_CONFIG", "english")
+MEDIA_ACCEL_REDIRECT = bool(int(os.environ.get("MEDIA_ACCEL_REDIRECT", 0)))
+MEDIA_CACHE_MAX_AGE = int(os.environ.get("MEDIA_CACHE_MAX_AGE", 86400))
+
+RECIPE_IMAGE_STORAGE = os.environ.get(
+    "RECIPE_IMAGE_STORAGE", "core.storage.ContentAddressedStorage"
+)
+RECIPE_IMAGE_RENDITIONS = [200, 400, 800, 1600]
+# Unreferenced images younger than this may be about to be referenced
+# again, so they are only deleted once older.
+RECIPE_IMAGE_GC_MIN_AGE = int(os.environ.get("RECIPE_IMAGE_GC_MIN_AGE", 3600))
+RECIPE_IMAGE_SIZES = {"thumbnail": 200, "medium": 800}
+RECIPE_IMAGE_QUALITY = int(os.environ.get("RECIPE_IMAGE_QUALITY", 85))
+# Matches client_max_body_size in the proxy.
+RECIPE_IMAGE_MAX_UPLOAD_SIZE = int(
+    os.environ.get("RECIPE_IMAGE_MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+)
+RECIPE_IMAGE_MAX_DIMENSION = int(
+    os.environ.get("RECIPE_IMAGE_MAX_DIMENSION", 8000)
+)
+RECIPE_IMAGE_MAX_PIXELS = int(
+    os.environ.get("RECIPE_IMAGE_MAX_PIXELS", 40_000_000)
+)
+
+TASK_WORKERS = int(os.environ.get("TASK_WORKERS", 2))
+TASKS_EAGER = bool(int(os.environ.get("TASKS_EAGER", 0)))
+
 SPECTACULAR_SETTINGS = {
     "COMPONENT_SPLIT_REQUEST": True
 }
+
+# Written when the image is built and served by /api/schema, which only
+# generates the schema per request when DEBUG is on (see core.schema).
+API_SCHEMA_FILE = os.environ.get(
+    "API_SCHEMA_FILE", str(BASE_DIR / "schema.yml")
+)
+API_SCHEMA_MAX_AGE = int(os.environ.get("API_SCHEMA_MAX_AGE", 3600))
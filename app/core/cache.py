@@ -0,0 +1,168 @@
+"""
+Shared cache helpers.
+
+Per-user data is cached under keys that embed a per-user version. Any
+write to a user's recipes, tags or ingredients bumps the version, which
+invalidates every cached entry for that user at once.
+
+Reads through get_cached count hits and misses per namespace, which
+each process logs every CACHE_METRICS_LOG_INTERVAL seconds.
+"""
+import pickle
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.signals import request_finished
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from core.metrics import Counters
+
+
+metrics = Counters(["hits", "misses"])
+
+
+def _initial_version():
+    # Time based so versions never repeat after an eviction or restart.
+    return int(time.time() * 1000)
+
+
+def user_version_key(user_id):
+    return f"user:{user_id}:version"
+
+
+def get_user_version(user_id):
+    """Return the current cache version for a user."""
+    key = user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key, _initial_version())
+    return version
+
+
+def bump_user_version(user_id):
+    """Invalidate everything cached for a user."""
+    key = user_version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def user_cache_key(user_id, *parts):
+    """Build a cache key namespaced and versioned per user."""
+    version = get_user_version(user_id)
+    return ":".join(["user", str(user_id), f"v{version}", *map(str, parts)])
+
+
+def get_cached(key, namespace, default=None, alias=DEFAULT_CACHE_ALIAS):
+    """Read from a cache, recording a hit or miss for namespace."""
+    value = caches[alias].get(key, default)
+    metrics.record(namespace, "hits" if value is not default else "misses")
+    return value
+
+
+@receiver(request_finished)
+def log_cache_metrics(**kwargs):
+    """Log hits and misses every CACHE_METRICS_LOG_INTERVAL seconds."""
+    metrics.log_if_due("Cache", settings.CACHE_METRICS_LOG_INTERVAL)
+
+
+class RedisCache(BaseCache):
+    """
+    Minimal Redis backend.
+
+    LOCATION is a redis:// URL. OPTIONS["CLIENT_CLASS"] may point to any
+    class with a redis-py compatible from_url(), e.g. fakeredis.FakeRedis
+    for a local stand-in.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        client_class = import_string(
+            options.get("CLIENT_CLASS", "redis.Redis")
+        )
+        self._client = client_class.from_url(server)
+
+    def _ttl(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return max(int(timeout), 0)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _dumps(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        return pickle.dumps(value)
+
+    def _loads(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            return pickle.loads(value)
+
+    def _set(self, key, value, timeout, nx=False):
+        ttl = self._ttl(timeout)
+        if ttl == 0:
+            self._client.delete(key)
+            return not nx
+        return bool(self._client.set(key, self._dumps(value), ex=ttl, nx=nx))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._set(self._key(key, version), value, timeout, nx=True)
+
+    def get(self, key, default=None, version=None):
+        value = self._client.get(self._key(key, version))
+        return default if value is None else self._loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._set(self._key(key, version), value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        ttl = self._ttl(timeout)
+        if ttl is None:
+            return bool(self._client.persist(key))
+        return bool(self._client.expire(key, ttl))
+
+    def delete(self, key, version=None):
+        return bool(self._client.delete(self._key(key, version)))
+
+    def has_key(self, key, version=None):
+        return bool(self._client.exists(self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        if not self._client.exists(key):
+            raise ValueError(f"Key '{key}' not found")
+        return self._client.incr(key, delta)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = self._client.mget([self._key(k, version) for k in keys])
+        return {
+            key: self._loads(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._client.delete(*keys)
+
+    def clear(self):
+        self._client.flushdb()
+
+    def close(self, **kwargs):
+        pass
@@ -0,0 +1,61 @@
+"""
+Persistent database connection health checks and reuse metrics.
+
+With CONN_MAX_AGE > 0 a worker keeps its connection between requests.
+Before a request reuses one that hasn't been checked for
+DB_HEALTH_CHECK_INTERVAL seconds it is pinged, and dropped if the
+server went away, so the request opens a fresh one instead of failing.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.metrics import Counters
+
+
+logger = logging.getLogger(__name__)
+
+metrics = Counters(["created", "reused", "unhealthy"])
+
+
+def check_connection(conn):
+    """Close conn if it's overdue a health check and no longer usable."""
+    now = time.monotonic()
+    checked_at = getattr(conn, "health_checked_at", 0)
+    if now - checked_at < settings.DB_HEALTH_CHECK_INTERVAL:
+        return True
+
+    conn.health_checked_at = now
+    if conn.is_usable():
+        return True
+
+    metrics.record(conn.alias, "unhealthy")
+    logger.warning("Dropping unusable connection to %r.", conn.alias)
+    conn.close()
+    return False
+
+
+@receiver(connection_created)
+def record_connection_created(sender, connection, **kwargs):
+    connection.health_checked_at = time.monotonic()
+    metrics.record(connection.alias, "created")
+    stats = metrics.snapshot()[connection.alias]
+    logger.info(
+        "Opened connection to %r (%d opened, %d reused).",
+        connection.alias, stats["created"], stats["reused"],
+    )
+
+
+@receiver(request_started)
+def check_persistent_connections(**kwargs):
+    """Health check connections carried over from a previous request."""
+    for conn in connections.all():
+        if conn.connection is None or conn.in_atomic_block:
+            continue
+        if check_connection(conn):
+            metrics.record(conn.alias, "reused")
@@ -0,0 +1,73 @@
+"""
+Django command comparing the stdlib and orjson JSON renderers.
+"""
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer, orjson
+
+
+def sample_recipes(rows):
+    """Build data shaped like a page of RecipeSerializer output."""
+    return {
+        "next": "http://localhost/api/recipe/recipes/?cursor=cD0xMjM%3D",
+        "previous": None,
+        "results": [
+            {
+                "id": i,
+                "title": f"Recipe {i} – crème brûlée",
+                "time_minutes": i % 120,
+                "price": str(Decimal(i % 10000) / 100),
+                "link": f"https://example.com/recipes/{i}.pdf",
+                "tags": [
+                    {"id": i * 3 + t, "name": f"tag {t}"} for t in range(3)
+                ],
+                "ingredients": [
+                    {"id": i * 8 + n, "name": f"ingredient {n}"}
+                    for n in range(8)
+                ],
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    """Benchmark JSON rendering of large recipe lists."""
+
+    help = "Compare JSONRenderer and FastJSONRenderer on recipe lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed.")
+
+        data = sample_recipes(options["rows"])
+        renderers = [
+            ("stdlib", JSONRenderer()),
+            ("orjson", FastJSONRenderer()),
+        ]
+        outputs = {name: r.render(data) for name, r in renderers}
+        if outputs["stdlib"] != outputs["orjson"]:
+            raise CommandError("Renderers produced different output.")
+
+        self.stdout.write(
+            f"{options['rows']} recipes, "
+            f"{len(outputs['stdlib'])} bytes, {options['repeat']} runs"
+        )
+        timings = {}
+        for name, renderer in renderers:
+            seconds = timeit.timeit(
+                lambda: renderer.render(data), number=options["repeat"]
+            )
+            timings[name] = seconds / options["repeat"]
+            self.stdout.write(f"{name:>8}: {timings[name] * 1000:.2f} ms")
+
+        speedup = timings["stdlib"] / timings["orjson"]
+        self.stdout.write(self.style.SUCCESS(f"orjson is {speedup:.1f}x"))
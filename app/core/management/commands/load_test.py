@@ -0,0 +1,83 @@
+"""
+Django command to load test a running API server.
+"""
+import itertools
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def fetch(url, headers, timeout):
+    """GET url, returning (status or None on errors, seconds taken)."""
+    start = time.perf_counter()
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return status, time.perf_counter() - start
+
+
+def percentile(sorted_values, percent):
+    index = round(percent / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    """Send concurrent GET requests and report throughput and latency."""
+
+    help = (
+        "Load test a running server, e.g. to compare the uwsgi and asgi "
+        "APP_SERVER profiles under the same concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="URLs to request in turn.")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--token", help="API token to authenticate with.")
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be >= 1.")
+
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+        urls = itertools.islice(
+            itertools.cycle(options["urls"]), options["requests"]
+        )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            results = list(pool.map(
+                lambda url: fetch(url, headers, options["timeout"]), urls
+            ))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(seconds * 1000 for _, seconds in results)
+        errors = sum(
+            1 for status, _ in results if status is None or status >= 400
+        )
+        self.stdout.write(
+            f"{len(results)} requests, concurrency {options['concurrency']}, "
+            f"{errors} errors in {elapsed:.2f}s"
+        )
+        self.stdout.write(f"throughput: {len(results) / elapsed:.1f} req/s")
+        self.stdout.write(
+            f"latency ms: mean {statistics.mean(latencies):.1f}, "
+            f"p50 {percentile(latencies, 50):.1f}, "
+            f"p95 {percentile(latencies, 95):.1f}, "
+            f"p99 {percentile(latencies, 99):.1f}"
+        )
+        if errors:
+            raise CommandError(f"{errors} request(s) failed.")
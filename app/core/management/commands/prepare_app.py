@@ -0,0 +1,82 @@
+"""
+Django command to get the database and static files ready on startup.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+STATIC_DIGEST_FILE = ".collectstatic.sha256"
+# As collectstatic's defaults.
+STATIC_IGNORE_PATTERNS = ["CVS", ".*", "*~"]
+
+
+def static_files_digest():
+    """Return a SHA-256 over the paths and contents of all static files."""
+    files = {}
+    for finder in get_finders():
+        for path, storage in finder.list(STATIC_IGNORE_PATTERNS):
+            prefix = getattr(storage, "prefix", None) or ""
+            files.setdefault(os.path.join(prefix, path), (storage, path))
+
+    digest = hashlib.sha256(settings.STATICFILES_STORAGE.encode())
+    for name, (storage, path) in sorted(files.items()):
+        digest.update(name.encode() + b"\0")
+        with storage.open(path) as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def has_pending_migrations(database=DEFAULT_DB_ALIAS):
+    """Return whether database has unapplied migrations."""
+    executor = MigrationExecutor(connections[database])
+    targets = executor.loader.graph.leaf_nodes()
+    return bool(executor.migration_plan(targets))
+
+
+class Command(BaseCommand):
+    """Wait for the database, then collect static files and migrate."""
+
+    help = (
+        "Run wait_for_db, then collectstatic unless the static files are "
+        "unchanged since the last run and migrate unless nothing is "
+        "unapplied, all in one process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Run collectstatic and migrate regardless.",
+        )
+
+    def handle(self, *args, **options):
+        call_command("wait_for_db", caches=["default"], stdout=self.stdout)
+
+        digest_path = os.path.join(settings.STATIC_ROOT, STATIC_DIGEST_FILE)
+        digest = static_files_digest()
+        try:
+            with open(digest_path) as f:
+                collected = f.read().strip()
+        except FileNotFoundError:
+            collected = None
+        if options["force"] or digest != collected:
+            call_command(
+                "collectstatic", interactive=False, stdout=self.stdout
+            )
+            with open(digest_path, "w") as f:
+                f.write(digest)
+        else:
+            self.stdout.write(
+                "Static files unchanged, skipping collectstatic."
+            )
+
+        if options["force"] or has_pending_migrations():
+            call_command("migrate", interactive=False, stdout=self.stdout)
+        else:
+            self.stdout.write("No migrations to apply, skipping migrate.")
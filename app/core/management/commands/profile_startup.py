@@ -0,0 +1,95 @@
+"""
+Django command to profile how long the app takes to start.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Run in a fresh interpreter, since this one has already imported the app.
+# Phase times go to stdout, -X importtime writes to stderr.
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import django
+django.setup()
+phases = {"setup": time.perf_counter() - start}
+start = time.perf_counter()
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+phases["middleware"] = time.perf_counter() - start
+start = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+phases["urls"] = time.perf_counter() - start
+print(json.dumps(phases))
+"""
+
+IMPORT_TIME_RE = re.compile(
+    r"^import time:\s+(?P<self>[0-9]+) \|\s+[0-9]+ \| (?P<module>.+)$"
+)
+
+
+def parse_import_times(output, depth=1):
+    """
+    Sum -X importtime self times in microseconds by module, grouping
+    modules by their first depth name parts.
+    """
+    totals = Counter()
+    for line in output.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if match:
+            module = match.group("module").strip()
+            group = ".".join(module.split(".")[:depth])
+            totals[group] += int(match.group("self"))
+    return totals
+
+
+class Command(BaseCommand):
+    """Profile app startup by phase and by imported module."""
+
+    help = (
+        "Start the app in a new interpreter and report how long settings "
+        "and apps, middleware and the URLconf take to load, and which "
+        "modules' imports cost the most."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--depth", type=int, default=1,
+            help="Group modules by this many name parts, 1 for packages.",
+        )
+        parser.add_argument("--limit", type=int, default=20)
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "app.settings"
+        ))
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"App failed to start:\n{result.stderr}")
+
+        phases = json.loads(result.stdout.splitlines()[-1])
+        for phase, seconds in phases.items():
+            self.stdout.write(f"{phase:<12} {seconds * 1000:8.1f} ms")
+        self.stdout.write(
+            f"{'total':<12} {sum(phases.values()) * 1000:8.1f} ms\n"
+        )
+
+        totals = parse_import_times(result.stderr, options["depth"])
+        self.stdout.write(
+            f"Imports: {sum(totals.values()) / 1000:.1f} ms in "
+            f"{len(totals)} modules"
+        )
+        for module, micros in totals.most_common(options["limit"]):
+            self.stdout.write(f"{micros / 1000:8.1f} ms  {module}")
@@ -1,27 +1,145 @@
 """
 Django command to wait for the DB to be available.
 """
+import random
 import time
-from typing import Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterator, Optional
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.core.cache import caches
+from django.db import connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Exit codes when something isn't available before --timeout, so that
+# readiness probes can tell what is down.
+EXIT_DATABASE_UNAVAILABLE = 3
+EXIT_CACHE_UNAVAILABLE = 4
+
+DATABASE_ERRORS = (Psycopg2Error, OperationalError)
+# Cache backends raise their client library's errors.
+CACHE_ERRORS = (Exception,)
+
+
+def backoff_delays(initial: float, maximum: float) -> Iterator[float]:
+    """
+    Yield delays doubling from initial up to maximum, each randomly
+    shortened by up to half so that waiting processes spread out.
+    """
+    delay = initial
+    while True:
+        yield delay / 2 + random.uniform(0, delay / 2)
+        delay = min(delay * 2, maximum)
 
 
 class Command(BaseCommand):
     """Command to wait for database."""
 
+    help = (
+        "Wait until the databases and caches can be used, checking them "
+        "concurrently with exponential backoff. Exits with "
+        f"{EXIT_DATABASE_UNAVAILABLE} if a database or "
+        f"{EXIT_CACHE_UNAVAILABLE} if only a cache isn't available "
+        "within --timeout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", action="append", dest="databases",
+            help="Database alias to wait for, 'default' if not given.",
+        )
+        parser.add_argument(
+            "--cache", action="append", dest="caches", default=[],
+            help="Cache alias to wait for.",
+        )
+        parser.add_argument(
+            "--timeout", type=float,
+            help="Give up after this many seconds, by default never.",
+        )
+        parser.add_argument("--initial-delay", type=float, default=0.1)
+        parser.add_argument("--max-delay", type=float, default=5)
+
+    def check_database(self, alias: str) -> None:
+        try:
+            self.check(databases=[alias])
+        finally:
+            connections[alias].close()
+
+    def check_cache(self, alias: str) -> None:
+        try:
+            caches[alias].get("wait_for_db")
+        finally:
+            caches[alias].close()
+
+    def wait_for(
+        self,
+        name: str,
+        check: Callable[[], None],
+        errors: tuple,
+        deadline: Optional[float],
+        options: dict,
+    ) -> bool:
+        """Retry check until it passes, returning False at deadline."""
+        delays = backoff_delays(options["initial_delay"], options["max_delay"])
+        while True:
+            try:
+                check()
+                return True
+            except errors:
+                delay = next(delays)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    delay = min(delay, remaining)
+                self.stdout.write(
+                    f"{name} not yet available. Retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+
     def handle(self, *args: Any, **options: Any) -> Optional[str]:
         self.stdout.write("Waiting for database.")
-        db_up = False
-        while not db_up:
-            try:
-                self.check(databases=["default"])
-                db_up = True
-            except (Psycopg2Error, OperationalError):
-                self.stdout.write("DB not yet available. Sleeping for 1s")
-                time.sleep(1)
+        deadline = None
+        if options["timeout"] is not None:
+            deadline = time.monotonic() + options["timeout"]
+
+        targets = [
+            (
+                f"Database {alias!r}",
+                partial(self.check_database, alias),
+                DATABASE_ERRORS,
+                EXIT_DATABASE_UNAVAILABLE,
+            )
+            for alias in options["databases"] or ["default"]
+        ] + [
+            (
+                f"Cache {alias!r}",
+                partial(self.check_cache, alias),
+                CACHE_ERRORS,
+                EXIT_CACHE_UNAVAILABLE,
+            )
+            for alias in options["caches"]
+        ]
+        # Each check runs on its own thread, with its own connection.
+        with ThreadPoolExecutor(len(targets)) as pool:
+            ready = list(pool.map(
+                lambda target: self.wait_for(
+                    target[0], target[1], target[2], deadline, options
+                ),
+                targets,
+            ))
 
+        unavailable = [
+            target for target, is_ready in zip(targets, ready) if not is_ready
+        ]
+        if unavailable:
+            raise CommandError(
+                "Timed out waiting for "
+                + ", ".join(name for name, *_ in unavailable) + ".",
+                returncode=min(code for *_, code in unavailable),
+            )
         self.stdout.write(self.style.SUCCESS("Database ready."))
@@ -0,0 +1,33 @@
+"""
+Responses handing stored media to the client.
+
+With MEDIA_ACCEL_REDIRECT on, views only answer with an X-Accel-Redirect
+header naming the file's media URL, which the proxy serves from an
+internal location, so workers never stream file contents. Otherwise,
+e.g. under runserver, the file is streamed by Django.
+"""
+import mimetypes
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import patch_cache_control
+
+
+# Not known to mimetypes before Python 3.11.
+mimetypes.add_type("image/webp", ".webp")
+
+
+def media_response(storage, name):
+    """Return a response serving the stored file name."""
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = storage.url(name)
+    else:
+        response = FileResponse(
+            storage.open(name, "rb"), content_type=content_type
+        )
+    patch_cache_control(
+        response, private=True, max_age=settings.MEDIA_CACHE_MAX_AGE
+    )
+    return response
@@ -0,0 +1,58 @@
+"""
+Process-local metrics.
+
+Each process counts its own events, so counts are read where they are
+kept: by the code itself, or from the lines log_if_due writes to the
+logs.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+
+
+logger = logging.getLogger(__name__)
+
+
+class Counters:
+    """Thread-safe counts of kinds of events per group, e.g. per alias."""
+
+    def __init__(self, kinds):
+        self.kinds = tuple(kinds)
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._logged_at = time.monotonic()
+
+    def record(self, group, kind):
+        with self._lock:
+            self._counts[(group, kind)] += 1
+
+    def snapshot(self):
+        """Return {group: {kind: n}}, with a count for each of kinds."""
+        with self._lock:
+            stats = {}
+            for (group, kind), count in self._counts.items():
+                stats.setdefault(group, dict.fromkeys(self.kinds, 0))
+                stats[group][kind] = count
+            return stats
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+    def log_if_due(self, name, interval):
+        """
+        Log a line of counts per group, unless interval seconds haven't
+        passed since the last time. An interval of 0 never logs.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not interval or now - self._logged_at < interval:
+                return False
+            self._logged_at = now
+        for group, counts in sorted(self.snapshot().items()):
+            logger.info(
+                "%s %r: %s.", name, group,
+                ", ".join(f"{count} {kind}" for kind, count in counts.items()),
+            )
+        return True
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-17 00:21
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Fold duplicate (user, name) tags/ingredients into the oldest one."""
+    Recipe = apps.get_model("core", "Recipe")
+    for model_name, field in (("Tag", "tags"), ("Ingredient", "ingredients")):
+        model = apps.get_model("core", model_name)
+        through = getattr(Recipe, field).through
+        target = f"{model_name.lower()}_id"
+        duplicates = model.objects.values("user_id", "name").annotate(
+            keep=Min("id"), count=Count("id")
+        ).filter(count__gt=1)
+
+        for dup in duplicates:
+            others = list(model.objects.filter(
+                user_id=dup["user_id"], name=dup["name"]
+            ).exclude(id=dup["keep"]).values_list("id", flat=True))
+            linked = set(through.objects.filter(
+                **{target: dup["keep"]}
+            ).values_list("recipe_id", flat=True))
+
+            for row in through.objects.filter(**{f"{target}__in": others}):
+                if row.recipe_id in linked:
+                    row.delete()
+                    continue
+                setattr(row, target, dup["keep"])
+                row.save()
+                linked.add(row.recipe_id)
+
+            model.objects.filter(id__in=others).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_recipe_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-17 09:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def populate_search_vector(apps, schema_editor):
+    """Fill the search vector of existing recipes."""
+    from django.conf import settings
+
+    config = settings.RECIPE_SEARCH_CONFIG
+    Recipe = apps.get_model("core", "Recipe")
+    Recipe.objects.update(search_vector=(
+        SearchVector("title", weight="A", config=config)
+        + SearchVector("description", weight="B", config=config)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_recipe_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_idx'),
+        ),
+        migrations.RunPython(
+            populate_search_vector, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-17 00:29
+
+from django.db import migrations, models
+
+
+def mark_images_pending(apps, schema_editor):
+    """Queue existing images for the process_recipe_images command."""
+    Recipe = apps.get_model("core", "Recipe")
+    Recipe.objects.exclude(image__isnull=True).exclude(image="").update(
+        image_status="pending"
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recipe_range_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(mark_images_pending, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,8 @@ import os
 import uuid
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -9,13 +11,27 @@ from django.contrib.auth.models import (
     PermissionsMixin
 )
 
+from core.storage import recipe_image_storage
+
+
+RECIPE_IMAGE_DIR = os.path.join("uploads", "recipe")
+
 
 def recipe_image_file_path(_, filename):
     """Generate a file path for new recipe image."""
     ext = os.path.splitext(filename)[1]
     filename = f"{uuid.uuid4()}{ext}"
 
-    return os.path.join("uploads", "recipe", filename)
+    return os.path.join(RECIPE_IMAGE_DIR, filename)
+
+
+def recipe_search_vector():
+    """Build the weighted search vector stored on recipes."""
+    config = settings.RECIPE_SEARCH_CONFIG
+    return (
+        SearchVector("title", weight="A", config=config)
+        + SearchVector("description", weight="B", config=config)
+    )
 
 
 class UserManager(BaseUserManager):
@@ -54,8 +70,21 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
+class RecipeQuerySet(models.QuerySet):
+    """QuerySet for recipes."""
+    def update_search_vector(self):
+        """Recompute the stored search vector of matched recipes."""
+        return self.update(search_vector=recipe_search_vector())
+
+
 class Recipe(models.Model):
     """Recipe object."""
+    class ImageStatus(models.TextChoices):
+        PENDING = "pending"
+        PROCESSING = "processing"
+        READY = "ready"
+        FAILED = "failed"
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
@@ -67,11 +96,48 @@ class Recipe(models.Model):
     link = models.CharField(max_length=255, blank=True)
     tags = models.ManyToManyField("Tag")
     ingredients = models.ManyToManyField("Ingredient")
-    image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    image = models.ImageField(
+        null=True,
+        db_index=True,
+        upload_to=recipe_image_file_path,
+        storage=recipe_image_storage,
+    )
+    image_status = models.CharField(
+        max_length=10, choices=ImageStatus.choices, blank=True
+    )
+    image_status_changed = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
+    image_variants = models.JSONField(default=dict, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="recipe_user_id_idx"),
+            models.Index(
+                fields=["user", "time_minutes", "id"],
+                name="recipe_user_time_idx",
+            ),
+            models.Index(
+                fields=["user", "price", "id"], name="recipe_user_price_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="recipe_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """Save recipe and refresh its search vector."""
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"title", "description"} & set(
+            update_fields
+        ):
+            Recipe.objects.filter(pk=self.pk).update_search_vector()
+
 
 class Tag(models.Model):
     """Tag for filtering recipes."""
@@ -81,6 +147,13 @@ class Tag(models.Model):
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="unique_tag_user_name"
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -92,5 +165,12 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="unique_ingredient_user_name"
+            ),
+        ]
+
     def __str__(self):
         return self.name
@@ -0,0 +1,68 @@
+"""
+Serving of the OpenAPI schema generated ahead of time.
+
+The schema is written to API_SCHEMA_FILE when the image is built (see
+the Dockerfile) with `manage.py spectacular --file`, so requests don't
+introspect every view and serializer again. Only with DEBUG on is it
+generated per request, to follow code changes.
+"""
+import hashlib
+import json
+from functools import lru_cache
+
+import yaml
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+
+@lru_cache(maxsize=None)
+def rendered_schema(path, output_format):
+    """
+    Return the schema in the YAML file at path as (content, etag),
+    converted to JSON if output_format is "json".
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    if output_format == "json":
+        # Indented as drf_spectacular's OpenApiJsonRenderer does.
+        content = json.dumps(yaml.safe_load(content), indent=4).encode()
+    etag = quote_etag(hashlib.sha256(content).hexdigest())
+    return content, etag
+
+
+class SchemaView(SpectacularAPIView):
+    """SpectacularAPIView serving the schema from API_SCHEMA_FILE."""
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG:
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        try:
+            content, etag = rendered_schema(
+                settings.API_SCHEMA_FILE, renderer.format
+            )
+        except FileNotFoundError:
+            raise Http404("The API schema has not been generated.")
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        patch_cache_control(
+            response, public=True, max_age=settings.API_SCHEMA_MAX_AGE
+        )
+        patch_vary_headers(response, ["Accept"])
+        return response
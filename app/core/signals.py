@@ -0,0 +1,32 @@
+"""
+Signal handlers keeping cached data in sync with the models.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_user_version
+from core.models import Recipe, Tag, Ingredient
+
+
+def invalidate_user(user_id):
+    """Bump the user's cache version now and again once committed."""
+    bump_user_version(user_id)
+    transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_owner(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_relation_owner(sender, instance, action, **kwargs):
+    if action.startswith("post_"):
+        invalidate_user(instance.user_id)
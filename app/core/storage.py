@@ -0,0 +1,78 @@
+"""
+Storage backends for uploaded media.
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.module_loading import import_string
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage naming files by the SHA-256 of their content.
+
+    The directory and extension of the requested name are kept and the
+    rest replaced by the hash, so saving content that is already stored
+    returns the existing name instead of writing a copy. The existing
+    file's modification time is updated then, so cleanup that spares
+    recent files (see gc_recipe_images) spares it until the new
+    reference to it is saved.
+    """
+    hash_chunk_size = 64 * 1024
+
+    def content_name(self, name, content):
+        """Return the content-addressed name for content saved as name."""
+        digest = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks(self.hash_chunk_size):
+            digest.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        dirname, filename = os.path.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        return os.path.join(dirname, f"{digest.hexdigest()}{ext}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # The current time rather than the file system's coarser
+            # timestamp, to compare with times taken by the app.
+            now = time.time()
+            os.utime(self.path(name), (now, now))
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+def replace_file(storage, name, data):
+    """
+    Write the bytes data to name in a file system storage. Any existing
+    file is only replaced once all of data is written, so readers never
+    see it truncated or half written.
+    """
+    path = storage.path(name)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(temp_path, storage.file_permissions_mode or 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def recipe_image_storage():
+    """Return the storage configured for recipe images."""
+    return import_string(settings.RECIPE_IMAGE_STORAGE)()
@@ -0,0 +1,52 @@
+"""
+Local background task runner.
+
+Tasks run on a small per-process thread pool once the submitting
+transaction commits, so request handlers can hand off slow work and
+respond straight away. Each task closes the database connections its
+thread opened. With TASKS_EAGER set, tasks run inline on commit instead,
+which keeps tests and management commands deterministic.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.TASK_WORKERS,
+                thread_name_prefix="task",
+            )
+        return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed.", func.__name__)
+    finally:
+        connections.close_all()
+
+
+def submit(func, *args, **kwargs):
+    """Run func(*args, **kwargs) in the background after commit."""
+    if settings.TASKS_EAGER:
+        transaction.on_commit(lambda: func(*args, **kwargs))
+    else:
+        transaction.on_commit(
+            lambda: get_executor().submit(_run, func, args, kwargs)
+        )
@@ -0,0 +1,131 @@
+"""
+Tests for the cache helpers.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from core import cache as core_cache
+from core.models import Recipe, Tag, Ingredient
+from core.utils import create_user
+
+
+class UserVersionTests(TestCase):
+    """Tests for per-user versioned cache keys."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("user@example.com", "testpass123")
+
+    def test_user_cache_key_namespaced(self):
+        other = create_user("other@example.com", "testpass123")
+
+        key = core_cache.user_cache_key(self.user.id, "recipes")
+
+        self.assertIn(f"user:{self.user.id}:", key)
+        self.assertTrue(key.endswith(":recipes"))
+        other_key = core_cache.user_cache_key(other.id, "recipes")
+        self.assertNotEqual(key, other_key)
+
+    def test_version_bumped_on_writes(self):
+        """Test writes to the user's models bump the version."""
+        recipe = Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price=Decimal("1")
+        )
+        writes = [
+            lambda: Tag.objects.create(user=self.user, name="Hot"),
+            lambda: Ingredient.objects.create(user=self.user, name="Salt"),
+            lambda: recipe.tags.add(Tag.objects.get(name="Hot")),
+            lambda: recipe.save(),
+            lambda: recipe.delete(),
+        ]
+        for write in writes:
+            version = core_cache.get_user_version(self.user.id)
+            write()
+            self.assertGreater(
+                core_cache.get_user_version(self.user.id), version
+            )
+
+    def test_version_isolated_per_user(self):
+        other = create_user("other@example.com", "testpass123")
+        version = core_cache.get_user_version(other.id)
+
+        Tag.objects.create(user=self.user, name="Hot")
+
+        self.assertEqual(core_cache.get_user_version(other.id), version)
+
+    def test_version_survives_eviction(self):
+        """Test a lost version key doesn't reuse an older version."""
+        version = core_cache.get_user_version(self.user.id)
+        cache.delete(core_cache.user_version_key(self.user.id))
+
+        core_cache.bump_user_version(self.user.id)
+
+        self.assertGreaterEqual(
+            core_cache.get_user_version(self.user.id), version
+        )
+
+
+class CacheMetricsTests(SimpleTestCase):
+    """Tests for cache hit/miss metrics."""
+
+    def setUp(self):
+        cache.clear()
+        core_cache.metrics.reset()
+
+    def test_hits_and_misses_recorded(self):
+        core_cache.get_cached("missing", "recipes")
+        cache.set("present", 1)
+        core_cache.get_cached("present", "recipes")
+        core_cache.get_cached("present", "recipes")
+
+        self.assertEqual(
+            core_cache.metrics.snapshot(),
+            {"recipes": {"hits": 2, "misses": 1}},
+        )
+
+
+class RedisCacheTests(SimpleTestCase):
+    """Tests for RedisCache against a fakeredis stand-in."""
+
+    def setUp(self):
+        self.cache = core_cache.RedisCache(
+            "redis://localhost:6379/0",
+            {"OPTIONS": {"CLIENT_CLASS": "fakeredis.FakeRedis"}},
+        )
+        self.cache.clear()
+
+    def test_set_get_delete(self):
+        self.cache.set("key", {"a": 1})
+
+        self.assertEqual(self.cache.get("key"), {"a": 1})
+        self.assertTrue(self.cache.delete("key"))
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_add_only_when_missing(self):
+        self.assertTrue(self.cache.add("key", 1))
+        self.assertFalse(self.cache.add("key", 2))
+        self.assertEqual(self.cache.get("key"), 1)
+
+    def test_incr(self):
+        self.cache.set("counter", 1)
+
+        self.assertEqual(self.cache.incr("counter", 2), 3)
+        self.assertEqual(self.cache.get("counter"), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_many(self):
+        self.cache.set_many({"a": 1, "b": "two"})
+
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {
+            "a": 1, "b": "two",
+        })
+        self.cache.delete_many(["a", "b"])
+        self.assertEqual(self.cache.get_many(["a", "b"]), {})
+
+    def test_zero_timeout_not_stored(self):
+        self.cache.set("key", 1, timeout=0)
+
+        self.assertFalse(self.cache.has_key("key"))
@@ -1,13 +1,25 @@
 """
 Test our custom mng commands.
 """
-from unittest.mock import patch
+import json
+import subprocess
+import tempfile
+from io import StringIO
+from itertools import islice
+from unittest.mock import ANY, call, patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.management.commands.profile_startup import parse_import_times
+from core.management.commands.wait_for_db import (
+    EXIT_CACHE_UNAVAILABLE,
+    EXIT_DATABASE_UNAVAILABLE,
+    backoff_delays,
+)
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -34,3 +46,206 @@ class CommandTests(SimpleTestCase):
         call_command("wait_for_db")
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+    def test_wait_for_db_backoff_delays(self, patched_check):
+        """Test delays double up to the maximum, with jitter."""
+        delays = list(islice(backoff_delays(0.1, 0.5), 5))
+
+        for delay, base in zip(delays, [0.1, 0.2, 0.4, 0.5, 0.5]):
+            self.assertGreaterEqual(delay, base / 2)
+            self.assertLessEqual(delay, base)
+
+    @patch("time.sleep")
+    def test_wait_for_db_timeout(self, patched_sleep, patched_check):
+        """Test giving up after the timeout with the database exit code."""
+        patched_check.side_effect = OperationalError
+
+        with self.assertRaises(CommandError) as cm:
+            call_command("wait_for_db", timeout=0, stdout=StringIO())
+
+        self.assertEqual(cm.exception.returncode, EXIT_DATABASE_UNAVAILABLE)
+        patched_check.assert_called_once_with(databases=["default"])
+        patched_sleep.assert_not_called()
+
+    @patch("time.sleep")
+    @patch("core.management.commands.wait_for_db.caches")
+    def test_wait_for_db_cache(
+        self, patched_caches, patched_sleep, patched_check
+    ):
+        """Test waiting for a cache alongside the database."""
+        cache = patched_caches.__getitem__.return_value
+        cache.get.side_effect = [ConnectionError, None]
+
+        call_command("wait_for_db", caches=["default"], stdout=StringIO())
+
+        self.assertEqual(cache.get.call_count, 2)
+        patched_caches.__getitem__.assert_called_with("default")
+        patched_check.assert_called_once_with(databases=["default"])
+
+    @patch("core.management.commands.wait_for_db.caches")
+    def test_wait_for_db_cache_timeout(self, patched_caches, patched_check):
+        """Test the cache exit code when only the cache is down."""
+        cache = patched_caches.__getitem__.return_value
+        cache.get.side_effect = ConnectionError
+
+        with self.assertRaises(CommandError) as cm:
+            call_command(
+                "wait_for_db", caches=["default"], timeout=0,
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(cm.exception.returncode, EXIT_CACHE_UNAVAILABLE)
+
+
+@patch("core.management.commands.load_test.fetch")
+class LoadTestCommandTests(SimpleTestCase):
+    """Test the load_test command."""
+
+    def test_load_test_reports_latency(self, patched_fetch):
+        """Test requests cycle through the URLs and latency is reported."""
+        patched_fetch.return_value = (200, 0.01)
+        out = StringIO()
+
+        call_command(
+            "load_test", "http://a/", "http://b/",
+            requests=4, concurrency=2, token="abc", stdout=out,
+        )
+
+        urls = [c.args[0] for c in patched_fetch.call_args_list]
+        self.assertEqual(sorted(urls), ["http://a/"] * 2 + ["http://b/"] * 2)
+        headers = patched_fetch.call_args.args[1]
+        self.assertEqual(headers, {"Authorization": "Token abc"})
+        self.assertIn("4 requests, concurrency 2, 0 errors", out.getvalue())
+        self.assertIn("p50 10.0", out.getvalue())
+
+    def test_load_test_fails_on_errors(self, patched_fetch):
+        """Test failed requests make the command fail."""
+        patched_fetch.side_effect = [(200, 0.01), (500, 0.01), (None, 0.01)]
+
+        with self.assertRaisesMessage(CommandError, "2 request(s) failed."):
+            call_command(
+                "load_test", "http://a/", requests=3, stdout=StringIO()
+            )
+
+
+@patch("core.management.commands.prepare_app.call_command")
+class PrepareAppCommandTests(TestCase):
+    """Test the prepare_app command."""
+
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        settings_override = override_settings(STATIC_ROOT=static_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def called_commands(self, patched_call_command):
+        return [c.args[0] for c in patched_call_command.call_args_list]
+
+    def test_prepare_app_skips_unchanged_steps(self, patched_call_command):
+        """Test collectstatic and migrate are skipped with nothing to do."""
+        call_command("prepare_app", stdout=StringIO())
+        call_command("prepare_app", stdout=StringIO())
+
+        self.assertEqual(
+            self.called_commands(patched_call_command),
+            ["wait_for_db", "collectstatic", "wait_for_db"],
+        )
+
+    @patch("core.management.commands.prepare_app.static_files_digest")
+    def test_prepare_app_collects_changed_static_files(
+        self, patched_digest, patched_call_command
+    ):
+        """Test collectstatic runs again when static files change."""
+        patched_digest.side_effect = ["a", "b"]
+        call_command("prepare_app", stdout=StringIO())
+        call_command("prepare_app", stdout=StringIO())
+
+        commands = self.called_commands(patched_call_command)
+        self.assertEqual(commands.count("collectstatic"), 2)
+
+    @patch("core.management.commands.prepare_app.has_pending_migrations")
+    def test_prepare_app_migrates_pending_migrations(
+        self, patched_pending, patched_call_command
+    ):
+        """Test migrate only runs when migrations are unapplied."""
+        patched_pending.return_value = True
+        call_command("prepare_app", stdout=StringIO())
+
+        self.assertIn(
+            call("migrate", interactive=False, stdout=ANY),
+            patched_call_command.call_args_list,
+        )
+
+    def test_prepare_app_force(self, patched_call_command):
+        """Test --force runs every step."""
+        call_command("prepare_app", stdout=StringIO())
+        call_command("prepare_app", force=True, stdout=StringIO())
+
+        self.assertEqual(
+            self.called_commands(patched_call_command)[2:],
+            ["wait_for_db", "collectstatic", "migrate"],
+        )
+
+
+IMPORT_TIMES = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     django.utils
+import time:       200 |        300 |   django.db.models
+import time:       300 |        600 | django
+import time:        50 |         50 | rest_framework
+unrelated output
+"""
+
+
+class ParseImportTimesTests(SimpleTestCase):
+    """Test parsing -X importtime output."""
+
+    def test_grouped_by_package(self):
+        """Test self times are summed by top-level package."""
+        totals = parse_import_times(IMPORT_TIMES)
+
+        self.assertEqual(totals, {"django": 600, "rest_framework": 50})
+
+    def test_grouped_by_depth(self):
+        """Test modules are grouped by their first depth name parts."""
+        totals = parse_import_times(IMPORT_TIMES, depth=2)
+
+        self.assertEqual(totals, {
+            "django.utils": 100,
+            "django.db": 200,
+            "django": 300,
+            "rest_framework": 50,
+        })
+
+
+@patch("core.management.commands.profile_startup.subprocess.run")
+class ProfileStartupCommandTests(SimpleTestCase):
+    """Test the profile_startup command."""
+
+    def test_profile_startup_reports_phases_and_imports(self, patched_run):
+        """Test phase times and the costliest imports are reported."""
+        phases = {"setup": 0.25, "middleware": 0.01, "urls": 0.04}
+        patched_run.return_value = subprocess.CompletedProcess(
+            [], 0, stdout=f"{json.dumps(phases)}\n", stderr=IMPORT_TIMES
+        )
+        out = StringIO()
+
+        call_command("profile_startup", limit=1, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("setup", output)
+        self.assertIn("250.0 ms", output)
+        self.assertIn("300.0 ms", output)
+        self.assertIn("Imports: 0.7 ms in 2 modules", output)
+        self.assertIn("0.6 ms  django", output)
+        self.assertNotIn("rest_framework", output)
+
+    def test_profile_startup_fails_when_app_fails(self, patched_run):
+        """Test the command fails with the app's error output."""
+        patched_run.return_value = subprocess.CompletedProcess(
+            [], 1, stdout="", stderr="ImproperlyConfigured"
+        )
+
+        with self.assertRaisesMessage(CommandError, "ImproperlyConfigured"):
+            call_command("profile_startup", stdout=StringIO())
@@ -0,0 +1,71 @@
+"""
+Tests for persistent connection health checks.
+"""
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from core import db
+
+
+def fake_connection(usable=True, checked_at=0):
+    conn = MagicMock(alias="default", in_atomic_block=False)
+    conn.is_usable.return_value = usable
+    conn.health_checked_at = checked_at
+    return conn
+
+
+@override_settings(DB_HEALTH_CHECK_INTERVAL=30)
+class ConnectionHealthTests(SimpleTestCase):
+    """Tests for request start connection checks."""
+
+    def setUp(self):
+        db.metrics.reset()
+
+    @patch("core.db.connections")
+    def test_healthy_connection_reused(self, patched_connections):
+        conn = fake_connection()
+        patched_connections.all.return_value = [conn]
+
+        db.check_persistent_connections()
+
+        conn.close.assert_not_called()
+        self.assertEqual(db.metrics.snapshot()["default"]["reused"], 1)
+
+    @patch("core.db.connections")
+    def test_unusable_connection_closed(self, patched_connections):
+        conn = fake_connection(usable=False)
+        patched_connections.all.return_value = [conn]
+
+        with self.assertLogs("core.db", "WARNING"):
+            db.check_persistent_connections()
+
+        conn.close.assert_called_once()
+        stats = db.metrics.snapshot()["default"]
+        self.assertEqual(stats["unhealthy"], 1)
+        self.assertEqual(stats["reused"], 0)
+
+    @patch("core.db.time.monotonic", return_value=100)
+    def test_recently_checked_connection_not_pinged(self, patched_time):
+        conn = fake_connection(checked_at=90)
+
+        self.assertTrue(db.check_connection(conn))
+        conn.is_usable.assert_not_called()
+
+    @patch("core.db.connections")
+    def test_closed_connection_skipped(self, patched_connections):
+        conn = fake_connection()
+        conn.connection = None
+        patched_connections.all.return_value = [conn]
+
+        db.check_persistent_connections()
+
+        conn.is_usable.assert_not_called()
+        self.assertEqual(db.metrics.snapshot(), {})
+
+    def test_connection_created_recorded(self):
+        conn = fake_connection()
+
+        db.record_connection_created(sender=None, connection=conn)
+
+        self.assertEqual(db.metrics.snapshot()["default"]["created"], 1)
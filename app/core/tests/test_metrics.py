@@ -0,0 +1,47 @@
+"""
+Tests for process-local metrics.
+"""
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.metrics import Counters
+
+
+class CountersTests(SimpleTestCase):
+    """Tests for Counters."""
+
+    def setUp(self):
+        self.counters = Counters(["hits", "misses"])
+
+    def test_snapshot_counts_every_kind(self):
+        self.counters.record("a", "hits")
+        self.counters.record("a", "hits")
+        self.counters.record("b", "misses")
+
+        self.assertEqual(self.counters.snapshot(), {
+            "a": {"hits": 2, "misses": 0},
+            "b": {"hits": 0, "misses": 1},
+        })
+
+    @patch("core.metrics.time.monotonic")
+    def test_logged_once_per_interval(self, patched_monotonic):
+        """Test counts are logged when the interval has passed."""
+        patched_monotonic.return_value = 0
+        counters = Counters(["hits", "misses"])
+        counters.record("tokens", "hits")
+
+        patched_monotonic.return_value = 30
+        self.assertFalse(counters.log_if_due("Cache", 60))
+        patched_monotonic.return_value = 61
+        with self.assertLogs("core.metrics") as logs:
+            self.assertTrue(counters.log_if_due("Cache", 60))
+        self.assertFalse(counters.log_if_due("Cache", 60))
+
+        self.assertEqual(
+            logs.output,
+            ["INFO:core.metrics:Cache 'tokens': 1 hits, 0 misses."],
+        )
+
+    def test_zero_interval_never_logs(self):
+        self.assertFalse(self.counters.log_if_due("Cache", 0))
@@ -1,6 +1,7 @@
 from decimal import Decimal
 from unittest.mock import patch
 
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
@@ -77,6 +78,16 @@ class ModelTests(TestCase):
         self.assertEqual(str(ingredient), ingredient.name)
         self.assertEqual("milk", ingredient.name)
 
+    def test_tag_name_unique_per_user(self):
+        """Test a user can't have two tags with the same name."""
+        user = create_user()
+        other = utils.create_user("other@example.com", "testpass")
+        models.Tag.objects.create(user=user, name="tag1")
+        models.Tag.objects.create(user=other, name="tag1")
+
+        with self.assertRaises(IntegrityError):
+            models.Tag.objects.create(user=user, name="tag1")
+
     @patch("core.models.uuid.uuid4")
     def test_recipe_file_name_uuid(self, mocked_uuid):
         """Test generating image path."""
@@ -0,0 +1,77 @@
+"""
+Tests for the orjson renderer and parser.
+"""
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONParser, FastJSONRenderer
+
+
+SAMPLE = {
+    "id": 1,
+    "title": "Crème brûlée \u2028 line \u2029 paragraph",
+    "price": Decimal("5.25"),
+    "created": datetime.datetime(
+        2023, 7, 22, 19, 20, 1, 123456, tzinfo=datetime.timezone.utc
+    ),
+    "day": datetime.date(2023, 7, 22),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "lazy": gettext_lazy("Invalid token."),
+    "ratio": 0.1,
+    "tuple": (1, 2),
+    "nested": [{"id": 2, "name": "tag", "empty": None, "flag": True}],
+    3: "int key",
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Tests for FastJSONRenderer."""
+
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE),
+            JSONRenderer().render(SAMPLE),
+        )
+
+    def test_indented_output_matches_json_renderer(self):
+        media_type = "application/json; indent=4"
+
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE, media_type),
+            JSONRenderer().render(SAMPLE, media_type),
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_benchmark_command_checks_parity(self):
+        out = io.StringIO()
+
+        call_command("benchmark_json", rows=50, repeat=1, stdout=out)
+
+        self.assertIn("orjson is", out.getvalue())
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """Tests for FastJSONParser."""
+
+    def test_parse_matches_json_parser(self):
+        body = '{"title": "Crème", "tags": [{"name": "a"}], "n": 1.5}'
+
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body.encode())),
+            JSONParser().parse(io.BytesIO(body.encode())),
+        )
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b"{not json"))
@@ -0,0 +1,102 @@
+"""
+Tests for serving the pre-generated API schema.
+"""
+import os
+import tempfile
+
+import yaml
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.schema import rendered_schema
+
+
+SCHEMA_URL = reverse("api-schema")
+SCHEMA_YAML = b"openapi: 3.0.3\ninfo:\n  title: Generated\npaths: {}\n"
+
+
+class SchemaViewTests(SimpleTestCase):
+    """Test the API schema endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(schema_dir.cleanup)
+        self.schema_file = os.path.join(schema_dir.name, "schema.yml")
+        with open(self.schema_file, "wb") as f:
+            f.write(SCHEMA_YAML)
+
+        settings_override = override_settings(
+            DEBUG=False,
+            API_SCHEMA_FILE=self.schema_file,
+            API_SCHEMA_MAX_AGE=600,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        rendered_schema.cache_clear()
+        self.addCleanup(rendered_schema.cache_clear)
+
+    def test_schema_served_from_file(self):
+        """Test the generated file is served with caching headers."""
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, SCHEMA_YAML)
+        self.assertTrue(
+            res["Content-Type"].startswith("application/vnd.oai.openapi")
+        )
+        self.assertIn("max-age=600", res["Cache-Control"])
+        self.assertIn("public", res["Cache-Control"])
+        self.assertIn("ETag", res)
+
+    def test_schema_not_modified(self):
+        """Test a request with a matching ETag gets 304."""
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_schema_as_json(self):
+        """Test JSON is served when asked for."""
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), yaml.safe_load(SCHEMA_YAML))
+        self.assertNotEqual(
+            res["ETag"], self.client.get(SCHEMA_URL)["ETag"]
+        )
+
+    def test_schema_file_missing(self):
+        """Test 404 is returned when the schema wasn't generated."""
+        os.remove(self.schema_file)
+
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_schema_generated_in_debug(self):
+        """Test the schema is generated per request with DEBUG on."""
+        with override_settings(DEBUG=True):
+            res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res.content, SCHEMA_YAML)
+        paths = yaml.safe_load(res.content)["paths"]
+        self.assertIn("/api/recipe/recipes/", paths)
+
+    def test_image_fields_documented(self):
+        """Test the recipe image URL fields are typed in the schema."""
+        with override_settings(DEBUG=True):
+            res = self.client.get(SCHEMA_URL)
+
+        schemas = yaml.safe_load(res.content)["components"]["schemas"]
+        properties = schemas["RecipeDetail"]["properties"]
+        for name in ["image_variants", "image_renditions"]:
+            self.assertEqual(properties[name]["type"], "object")
+            self.assertEqual(
+                properties[name]["additionalProperties"]["format"], "uri"
+            )
+        self.assertEqual(properties["image_srcset"]["type"], "string")
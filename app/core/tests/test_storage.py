@@ -0,0 +1,82 @@
+"""
+Tests for media storage backends.
+"""
+import hashlib
+import os
+import tempfile
+
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from core.storage import ContentAddressedStorage, replace_file
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    """Tests for ContentAddressedStorage."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.storage = ContentAddressedStorage(location=self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_named_by_content_hash(self):
+        name = self.storage.save("uploads/a.JPG", ContentFile(b"image"))
+
+        digest = hashlib.sha256(b"image").hexdigest()
+        self.assertEqual(name, f"uploads/{digest}.jpg")
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b"image")
+
+    def test_identical_content_stored_once(self):
+        first = self.storage.save("uploads/a.jpg", ContentFile(b"image"))
+        second = self.storage.save("uploads/b.jpg", ContentFile(b"image"))
+        other = self.storage.save("uploads/c.jpg", ContentFile(b"other"))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.tmpdir.name, "uploads"))), 2
+        )
+
+    def test_identical_content_refreshes_modified_time(self):
+        name = self.storage.save("uploads/a.jpg", ContentFile(b"image"))
+        os.utime(self.storage.path(name), (0, 0))
+
+        self.storage.save("uploads/b.jpg", ContentFile(b"image"))
+
+        self.assertGreater(os.path.getmtime(self.storage.path(name)), 0)
+
+
+class ReplaceFileTests(SimpleTestCase):
+    """Tests for replace_file."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.storage = ContentAddressedStorage(location=self.tmpdir.name)
+
+    def test_replaces_file(self):
+        replace_file(self.storage, "a/file.webp", b"old")
+        replace_file(self.storage, "a/file.webp", b"new")
+
+        with self.storage.open("a/file.webp") as f:
+            self.assertEqual(f.read(), b"new")
+        files = os.listdir(os.path.join(self.tmpdir.name, "a"))
+        self.assertEqual(files, ["file.webp"])
+        mode = os.stat(self.storage.path("a/file.webp")).st_mode
+        self.assertEqual(mode & 0o777, 0o644)
+
+    def test_failed_write_keeps_existing_file(self):
+        replace_file(self.storage, "file.webp", b"old")
+
+        with patch("os.replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                replace_file(self.storage, "file.webp", b"new")
+
+        with self.storage.open("file.webp") as f:
+            self.assertEqual(f.read(), b"old")
+        self.assertEqual(os.listdir(self.tmpdir.name), ["file.webp"])
@@ -0,0 +1,48 @@
+"""
+Tests for the background task runner.
+"""
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from core import tasks
+
+
+class SubmitTests(TestCase):
+    """Tests for submitting background tasks."""
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_runs_on_commit(self):
+        calls = []
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tasks.submit(calls.append, 1)
+            self.assertEqual(calls, [])
+
+        self.assertEqual(calls, [1])
+
+    @override_settings(TASKS_EAGER=False)
+    def test_runs_on_worker_thread(self):
+        done = threading.Event()
+        threads = []
+
+        def task():
+            threads.append(threading.current_thread())
+            done.set()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tasks.submit(task)
+
+        self.assertTrue(done.wait(5))
+        self.assertNotEqual(threads[0], threading.current_thread())
+
+    @patch("core.tasks.connections")
+    def test_failure_logged_and_connections_closed(self, patched):
+        def task():
+            raise ValueError("boom")
+
+        with self.assertLogs("core.tasks", "ERROR"):
+            tasks._run(task, (), {})
+
+        patched.close_all.assert_called_once_with()
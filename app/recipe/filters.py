@@ -0,0 +1,159 @@
+"""
+Filters for recipe APIs
+
+Relations are filtered with correlated EXISTS subqueries on the M2M
+through tables rather than joins, so rows are never duplicated and the
+querysets don't need distinct().
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Exists, F, FloatField, OuterRef
+from django.db.models.functions import Cast
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from core.models import Recipe
+
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+
+SEARCH_FULLTEXT = "fulltext"
+SEARCH_FUZZY = "fuzzy"
+SEARCH_ORDERING = ("-rank", "-id")
+
+ORDERINGS = {
+    "time_minutes": ("time_minutes", "id"),
+    "-time_minutes": ("-time_minutes", "-id"),
+    "price": ("price", "id"),
+    "-price": ("-price", "-id"),
+}
+
+RANGES = {
+    "min_time": "time_minutes__gte",
+    "max_time": "time_minutes__lte",
+    "min_price": "price__gte",
+    "max_price": "price__lte",
+}
+
+
+class RecipeFilterSerializer(serializers.Serializer):
+    """Serializer validating recipe list query parameters."""
+    match = serializers.ChoiceField(
+        choices=[MATCH_ANY, MATCH_ALL], required=False
+    )
+    search = serializers.CharField(
+        required=False, allow_blank=True, max_length=255
+    )
+    search_mode = serializers.ChoiceField(
+        choices=[SEARCH_FULLTEXT, SEARCH_FUZZY], default=SEARCH_FULLTEXT
+    )
+    min_time = serializers.IntegerField(required=False, min_value=0)
+    max_time = serializers.IntegerField(required=False, min_value=0)
+    min_price = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False, min_value=0
+    )
+    max_price = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False, min_value=0
+    )
+    ordering = serializers.ChoiceField(choices=list(ORDERINGS), required=False)
+
+    def validate(self, attrs):
+        bounds = [("min_time", "max_time"), ("min_price", "max_price")]
+        for low, high in bounds:
+            if low in attrs and high in attrs and attrs[low] > attrs[high]:
+                raise serializers.ValidationError(
+                    {low: [f"Must not be greater than {high}."]}
+                )
+        return attrs
+
+
+def _through_links(field):
+    """Return the through model and its recipe/target column names."""
+    relation = Recipe._meta.get_field(field)
+    through = relation.remote_field.through
+    return (
+        through,
+        f"{relation.m2m_field_name()}_id",
+        f"{relation.m2m_reverse_field_name()}_id",
+    )
+
+
+def _relation_for(model):
+    for relation in Recipe._meta.many_to_many:
+        if relation.related_model is model:
+            return relation.name
+    raise ValueError(f"Recipe has no many-to-many relation to {model}.")
+
+
+def filter_recipes_by_related(queryset, field, ids, match=MATCH_ANY):
+    """Keep recipes linked to any (or all) of ids through field."""
+    through, recipe_col, target_col = _through_links(field)
+    links = through.objects.filter(**{recipe_col: OuterRef("pk")})
+    if match == MATCH_ALL:
+        for pk in set(ids):
+            queryset = queryset.filter(
+                Exists(links.filter(**{target_col: pk}))
+            )
+        return queryset
+    return queryset.filter(
+        Exists(links.filter(**{f"{target_col}__in": ids}))
+    )
+
+
+def filter_assigned(queryset):
+    """Keep tags/ingredients that are linked to at least one recipe."""
+    through, _, target_col = _through_links(_relation_for(queryset.model))
+    return queryset.filter(
+        Exists(through.objects.filter(**{target_col: OuterRef("pk")}))
+    )
+
+
+@lru_cache(maxsize=None)
+def trigram_available(alias=DEFAULT_DB_ALIAS):
+    """Return whether the pg_trgm extension is installed."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_recipes(queryset, term, mode=SEARCH_FULLTEXT):
+    """
+    Keep recipes matching term, annotated with a rank to order by.
+
+    Full-text mode matches the stored search vector with web search
+    syntax. Fuzzy mode compares titles by trigram similarity to tolerate
+    typos. Ranks are cast to double precision so cursor positions
+    round-trip exactly.
+    """
+    if mode == SEARCH_FUZZY:
+        if not trigram_available(queryset.db):
+            raise ValidationError(
+                {"search_mode": ["Fuzzy search is not available."]}
+            )
+        return queryset.filter(title__trigram_similar=term).annotate(
+            rank=Cast(TrigramSimilarity("title", term), FloatField())
+        )
+    query = SearchQuery(
+        term, config=settings.RECIPE_SEARCH_CONFIG, search_type="websearch"
+    )
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+    )
+
+
+def filter_recipes_by_range(queryset, params):
+    """Apply the min/max bounds present in validated params."""
+    bounds = {
+        lookup: params[name]
+        for name, lookup in RANGES.items()
+        if name in params
+    }
+    return queryset.filter(**bounds)
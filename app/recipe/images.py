@@ -0,0 +1,154 @@
+"""
+Background processing of uploaded recipe images.
+
+Uploads are stored as received and processed by a background task,
+which decodes the image, applies and drops its EXIF orientation, saves
+it re-encoded without metadata as the recipe's new image and saves the
+preset WebP renditions of RECIPE_IMAGE_SIZES. Progress is tracked on
+Recipe.image_status.
+
+The re-encoded image is saved as a new file rather than over the
+upload, since with ContentAddressedStorage the upload may be shared
+with other recipes and its name is its content's hash. The upload is
+deleted afterwards unless another recipe uses it.
+"""
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from core import tasks
+from core.models import Recipe
+from core.signals import invalidate_user
+from recipe import renditions
+
+
+logger = logging.getLogger(__name__)
+
+Status = Recipe.ImageStatus
+
+
+def render_variants(field_file):
+    """
+    Save field_file re-encoded without metadata, and its preset
+    renditions.
+
+    Returns (name of the re-encoded image, {variant label: storage name}).
+    """
+    image, output_format = renditions.open_image(field_file.name)
+    name = field_file.storage.save(
+        field_file.name,
+        ContentFile(renditions.encode(image, output_format)),
+    )
+
+    return name, {
+        label: renditions.save_rendition(image, name, width)
+        for label, width in settings.RECIPE_IMAGE_SIZES.items()
+    }
+
+
+def set_image_status(queryset, status, **fields):
+    """Update the image status of queryset and record when it changed."""
+    return queryset.update(
+        image_status=status, image_status_changed=timezone.now(), **fields
+    )
+
+
+def process_recipe_image(recipe_id):
+    """Process the current image of a recipe and record the outcome."""
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is None or not recipe.image:
+        return
+
+    # Only touch the row while it still holds this upload, so a slow task
+    # can't overwrite the status of a newer one.
+    upload = recipe.image.name
+    queued = recipe.image_status_changed
+    current = Recipe.objects.filter(pk=recipe_id, image=upload)
+
+    # Identical to an image already processed for another recipe, so it
+    # has been stripped and has its renditions. Processing it again would
+    # only re-encode it once more.
+    processed_variants = Recipe.objects.filter(
+        image=upload, image_status=Status.READY
+    ).exclude(pk=recipe_id).values_list("image_variants", flat=True).first()
+    if processed_variants is not None:
+        set_image_status(
+            current, Status.READY, image_variants=processed_variants
+        )
+        invalidate_user(recipe.user_id)
+        return
+
+    set_image_status(current, Status.PROCESSING)
+    try:
+        name, variants = render_variants(recipe.image)
+    except Exception:
+        # Pillow raises all sorts, e.g. KeyError for formats it can read
+        # but not write. Anything left uncaught would leave the image
+        # processing forever.
+        logger.exception("Processing image of recipe %s failed.", recipe_id)
+        set_image_status(current, Status.FAILED)
+    else:
+        updated = set_image_status(
+            current, Status.READY, image=name, image_variants=variants
+        )
+        if updated and name != upload:
+            release_upload(upload, queued)
+    invalidate_user(recipe.user_id)
+
+
+def release_image(name):
+    """
+    Delete an image and its renditions unless a recipe still uses it.
+
+    Saving content that is already stored returns the existing name, and
+    the recipe referencing it may not be saved yet. So, as in
+    gc_recipe_images, images stored or saved again within the last
+    RECIPE_IMAGE_GC_MIN_AGE seconds are kept, to be collected later.
+    """
+    storage = renditions.image_storage()
+    if not name or not storage.exists(name):
+        return False
+    cutoff = timezone.now() - datetime.timedelta(
+        seconds=settings.RECIPE_IMAGE_GC_MIN_AGE
+    )
+    # Checked before the references: a concurrent save touches the file
+    # before its reference is written.
+    if storage.get_modified_time(name) > cutoff:
+        return False
+    if Recipe.objects.filter(image=name).exists():
+        return False
+    renditions.delete_renditions(name)
+    storage.delete(name)
+    return True
+
+
+def release_upload(name, queued):
+    """
+    Delete an upload replaced by its processed image unless a recipe
+    references it or it was saved again since it was queued at time
+    queued.
+
+    Saving identical content touches the stored file and returns its
+    name, so a later modification time means a recipe may be about to
+    reference it. Such uploads are left to gc_recipe_images.
+    """
+    storage = renditions.image_storage()
+    if queued is None or storage.get_modified_time(name) > queued:
+        return False
+    if Recipe.objects.filter(image=name).exists():
+        return False
+    storage.delete(name)
+    return True
+
+
+def queue_recipe_image(recipe):
+    """Mark recipe's image pending and process it in the background."""
+    set_image_status(
+        Recipe.objects.filter(pk=recipe.pk), Status.PENDING, image_variants={}
+    )
+    recipe.image_status = Status.PENDING
+    recipe.image_variants = {}
+    tasks.submit(process_recipe_image, recipe.pk)
@@ -0,0 +1,191 @@
+"""
+Django command to EXPLAIN the queries behind the recipe list APIs.
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from recipe import views
+
+
+WATCHED_TABLES = {
+    "core_recipe",
+    "core_tag",
+    "core_ingredient",
+    "core_recipe_tags",
+    "core_recipe_ingredients",
+}
+
+EXPECTED_INDEXES = {
+    "recipe-list-time": "recipe_user_time_idx",
+    "recipe-list-price": "recipe_user_price_idx",
+}
+
+
+def _ids_param(queryset):
+    ids = queryset.values_list("id", flat=True)[:3]
+    return ",".join(str(pk) for pk in ids)
+
+
+def build_cases(user):
+    """Return (name, viewset class, query params) for each checked query."""
+    tags = _ids_param(user.tag_set.all()) or "0"
+    ingredients = _ids_param(user.ingredient_set.all()) or "0"
+    return [
+        ("recipe-list", views.RecipeViewSet, {}),
+        ("recipe-list-tags", views.RecipeViewSet, {"tags": tags}),
+        (
+            "recipe-list-ingredients",
+            views.RecipeViewSet,
+            {"ingredients": ingredients},
+        ),
+        ("recipe-search", views.RecipeViewSet, {"search": "recipe"}),
+        (
+            "recipe-list-time",
+            views.RecipeViewSet,
+            {"min_time": 10, "max_time": 60, "ordering": "time_minutes"},
+        ),
+        (
+            "recipe-list-price",
+            views.RecipeViewSet,
+            {"max_price": "20.00", "ordering": "-price"},
+        ),
+        ("tag-list", views.TagViewSet, {}),
+        ("tag-list-assigned", views.TagViewSet, {"assigned_only": "1"}),
+        ("ingredient-list", views.IngredientViewSet, {}),
+        (
+            "ingredient-list-assigned",
+            views.IngredientViewSet,
+            {"assigned_only": "1"},
+        ),
+    ]
+
+
+def list_queryset(viewset_class, user, params):
+    """Build the first page query a list request with params runs."""
+    request = Request(APIRequestFactory().get("/", params))
+    request.user = user
+    view = viewset_class(
+        request=request, action="list", format_kwarg=None, args=(), kwargs={}
+    )
+    queryset = view.filter_queryset(view.get_queryset())
+    ordering = view.paginator.ordering
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    return queryset.order_by(*ordering)[:view.paginator.page_size + 1]
+
+
+def plan_nodes(plan):
+    """Yield every node of a JSON EXPLAIN plan."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def plan_indexes(plan):
+    """Return the names of indexes a JSON EXPLAIN plan scans."""
+    return {
+        node["Index Name"] for node in plan_nodes(plan) if "Index Name" in node
+    }
+
+
+class Command(BaseCommand):
+    """EXPLAIN recipe API queries and report plan regressions."""
+
+    help = (
+        "Run EXPLAIN on each recipe/tag/ingredient list query and report "
+        "sequential scans or cost increases against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Email of the user to plan for.")
+        parser.add_argument("--analyze", action="store_true")
+        parser.add_argument(
+            "--planner-defaults",
+            action="store_true",
+            help="Don't discourage sequential scans. By default they're "
+                 "disabled so plans show whether an index can serve the "
+                 "query even on small tables.",
+        )
+        parser.add_argument("--baseline", help="JSON file of case costs.")
+        parser.add_argument("--save-baseline", help="Write costs to file.")
+        parser.add_argument("--tolerance", type=float, default=0.2)
+
+    def _get_user(self, email):
+        users = get_user_model().objects.all()
+        if email:
+            user = users.filter(email=email).first()
+        else:
+            user = users.annotate(
+                recipes=Count("recipe")
+            ).order_by("-recipes").first()
+        if user is None:
+            raise CommandError("No user to plan queries for.")
+        return user
+
+    def _explain(self, queryset, options):
+        sql, params = queryset.query.sql_with_params()
+        explain = "ANALYZE, FORMAT JSON" if options["analyze"] else (
+            "FORMAT JSON"
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not options["planner_defaults"]:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN ({explain}) {sql}", params)
+            output = cursor.fetchone()[0]
+            cursor.execute("RESET enable_seqscan")
+        if isinstance(output, str):
+            output = json.loads(output)
+        return output[0]["Plan"]
+
+    def handle(self, *args, **options):
+        user = self._get_user(options["user"])
+        baseline = {}
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+
+        costs = {}
+        regressions = 0
+        for name, viewset_class, params in build_cases(user):
+            plan = self._explain(
+                list_queryset(viewset_class, user, params), options
+            )
+            costs[name] = plan["Total Cost"]
+            problems = [
+                f"Seq Scan on {node['Relation Name']}"
+                for node in plan_nodes(plan)
+                if node["Node Type"] == "Seq Scan"
+                and node.get("Relation Name") in WATCHED_TABLES
+            ]
+            index = EXPECTED_INDEXES.get(name)
+            if index and index not in plan_indexes(plan):
+                problems.append(f"{index} not used")
+            limit = baseline.get(name)
+            if limit is not None:
+                limit *= 1 + options["tolerance"]
+                if costs[name] > limit:
+                    problems.append(
+                        f"cost {costs[name]:.2f} > baseline {limit:.2f}"
+                    )
+
+            if problems:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(
+                    f"{name}: {'; '.join(problems)}"
+                ))
+            else:
+                self.stdout.write(f"{name}: cost {costs[name]:.2f} OK")
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as f:
+                json.dump(costs, f, indent=2, sort_keys=True)
+
+        if regressions:
+            raise CommandError(f"{regressions} query plan regression(s).")
+        self.stdout.write(self.style.SUCCESS("No plan regressions."))
@@ -0,0 +1,73 @@
+"""
+Django command to delete recipe images no recipe references.
+"""
+import datetime
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+from core.models import RECIPE_IMAGE_DIR, Recipe
+from recipe import renditions
+
+
+class Command(BaseCommand):
+    """Garbage-collect unreferenced recipe images and renditions."""
+
+    help = (
+        "Delete recipe images, and renditions of images, that no recipe "
+        "references."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=settings.RECIPE_IMAGE_GC_MIN_AGE,
+            help="Keep files younger than this many seconds, which may "
+                 "belong to uploads still being saved.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def _referenced(self):
+        names = Recipe.objects.exclude(image="").exclude(
+            image__isnull=True
+        ).values_list("image", flat=True)
+        return {os.path.basename(name) for name in names.iterator()}
+
+    def handle(self, *args, **options):
+        storage = renditions.image_storage()
+        if not storage.exists(RECIPE_IMAGE_DIR):
+            self.stdout.write("No recipe images stored.")
+            return
+
+        referenced = self._referenced()
+        stems = {os.path.splitext(name)[0] for name in referenced}
+        cutoff = timezone.now() - datetime.timedelta(
+            seconds=options["min_age"]
+        )
+
+        deleted = freed = 0
+        for filename in storage.listdir(RECIPE_IMAGE_DIR)[1]:
+            stem = renditions.rendition_stem(filename)
+            if filename in referenced or stem in stems:
+                continue
+            name = os.path.join(RECIPE_IMAGE_DIR, filename)
+            if storage.get_modified_time(name) > cutoff:
+                continue
+
+            deleted += 1
+            freed += storage.size(name)
+            if options["dry_run"]:
+                continue
+            if stem is None:
+                storage.delete(name)
+            else:
+                renditions.delete_rendition(name)
+
+        action = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {deleted} file(s), {filesizeformat(freed)}."
+        ))
@@ -0,0 +1,70 @@
+"""
+Django command to process pending recipe images.
+"""
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Recipe
+from recipe.images import process_recipe_image
+
+
+class Command(BaseCommand):
+    """Process recipe images still waiting for (or failed) processing."""
+
+    help = (
+        "Process recipe images left pending, e.g. by a restart before "
+        "their background task ran, or stuck processing because the "
+        "worker running it was killed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Also retry images whose processing failed.",
+        )
+        parser.add_argument(
+            "--pending-after",
+            type=int,
+            default=300,
+            help="Only process images pending for longer than this many "
+                 "seconds, whose background task was likely lost.",
+        )
+        parser.add_argument(
+            "--stuck-after",
+            type=int,
+            default=1800,
+            help="Retry images processing for longer than this many "
+                 "seconds.",
+        )
+
+    def unchanged_for(self, status, seconds):
+        """Return a Q of images in status for more than seconds."""
+        cutoff = timezone.now() - datetime.timedelta(seconds=seconds)
+        return Q(image_status=status) & (
+            Q(image_status_changed__lt=cutoff)
+            | Q(image_status_changed__isnull=True)
+        )
+
+    def handle(self, *args, **options):
+        # Images queued or started recently are most likely still being
+        # handled by the task that was submitted for them.
+        waiting = self.unchanged_for(
+            Recipe.ImageStatus.PENDING, options["pending_after"]
+        ) | self.unchanged_for(
+            Recipe.ImageStatus.PROCESSING, options["stuck_after"]
+        )
+        if options["retry_failed"]:
+            waiting |= Q(image_status=Recipe.ImageStatus.FAILED)
+        ids = Recipe.objects.filter(waiting).values_list("id", flat=True)
+
+        processed = 0
+        for recipe_id in ids.iterator():
+            process_recipe_image(recipe_id)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} image(s)."
+        ))
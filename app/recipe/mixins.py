@@ -0,0 +1,108 @@
+"""
+View mixins for recipe APIs
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+from core.cache import get_cached, get_user_version, user_cache_key
+from recipe.values_serializers import get_values_serializer
+
+
+class ConditionalListMixin:
+    """
+    Serve list actions with an ETag validator.
+
+    The ETag derives from the user's cache version, so a matching
+    If-None-Match is answered with 304 before any rows are read. With
+    RECIPE_LIST_CACHE enabled, rendered list responses are also cached
+    and served as is until the version changes.
+
+    Both need every process to see version bumps, so lists are served
+    plainly unless CACHE_SHARED. There's no Last-Modified, as its whole
+    seconds would miss writes made within the same second.
+    """
+    _etag = None
+    _list_cache_key = None
+
+    def _list_variant(self, request):
+        uri = request.build_absolute_uri()
+        variant = f"{uri}|{request.accepted_media_type}"
+        return hashlib.md5(variant.encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        if not settings.CACHE_SHARED:
+            return super().list(request, *args, **kwargs)
+
+        user_id = request.user.id
+        variant = self._list_variant(request)
+        version = get_user_version(user_id)
+        self._etag = quote_etag(f"{self.basename}-{version}-{variant}")
+
+        not_modified = get_conditional_response(request, etag=self._etag)
+        if not_modified is not None:
+            return not_modified
+
+        if settings.RECIPE_LIST_CACHE:
+            self._list_cache_key = user_cache_key(
+                user_id, self.basename, variant
+            )
+            cached = get_cached(self._list_cache_key, "api-list")
+            if cached is not None:
+                content, content_type = cached
+                self._list_cache_key = None
+                return HttpResponse(content, content_type=content_type)
+
+        return super().list(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self._etag is None or response.status_code not in (200, 304):
+            return response
+
+        if self._list_cache_key and isinstance(response, Response):
+            response.render()
+            cache.set(
+                self._list_cache_key,
+                (response.content, response["Content-Type"]),
+            )
+
+        response["ETag"] = self._etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ValuesListMixin:
+    """
+    Render list actions from values() rows instead of model instances.
+
+    Falls back to the regular serializer when its fields can't be
+    compiled into a ValuesSerializer.
+    """
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = get_values_serializer(self.get_serializer_class())
+        if values_serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = getattr(self.paginator, "ordering", ())
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        rows = values_serializer.values(
+            queryset, *[field.lstrip("-") for field in ordering]
+        )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                values_serializer.serialize(page)
+            )
+        return Response(values_serializer.serialize(rows))
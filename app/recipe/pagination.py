@@ -0,0 +1,153 @@
+"""
+Pagination for recipe APIs
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    _reverse_ordering,
+)
+from rest_framework.utils.urls import remove_query_param
+
+
+def keyset_filter(ordering, position):
+    """
+    Return a Q matching rows after position, the values of the ordering
+    fields of a row, e.g. (a > x) | (a = x & b > y) for ("a", "b").
+    """
+    condition = None
+    for field, value in reversed(list(zip(ordering, position))):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        after = Q(**{f"{name}__{lookup}": value})
+        if condition is not None:
+            after |= Q(**{name: value}) & condition
+        condition = after
+    return condition
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    CursorPagination positioned on every field of the ordering.
+
+    DRF's cursor only holds the first ordering field's value and an
+    offset past the rows sharing it, which gives up after offset_cutoff
+    ties, so the later fields never break them. Here the cursor holds
+    the values of all the fields, the last of which must be unique, and
+    pages start strictly after (or, going back, before) that row.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            _, reverse, position = self.cursor
+
+        # Going back, rows before the position are read in reverse.
+        ordering = _reverse_ordering(self.ordering) if reverse else (
+            self.ordering
+        )
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(keyset_filter(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Nothing precedes the position going back, so the rest
+            # starts at the first page.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=False,
+            position=self._get_position_from_instance(
+                self.page[-1], self.ordering
+            ),
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = None
+        if self.page:
+            position = self._get_position_from_instance(
+                self.page[0], self.ordering
+            )
+        # Without a row to go back from, the previous page is the last.
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or not all(isinstance(value, str) for value in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def encode_cursor(self, cursor):
+        if cursor.position is not None:
+            cursor = cursor._replace(position=json.dumps(cursor.position))
+        return super().encode_cursor(cursor)
+
+    def _get_position_from_instance(self, instance, ordering):
+        return [
+            super(KeysetCursorPagination, self)._get_position_from_instance(
+                instance, [field]
+            )
+            for field in ordering
+        ]
+
+
+class RecipeCursorPagination(KeysetCursorPagination):
+    """Keyset pagination for recipes, newest first."""
+
+    ordering = "-id"
+    page_size = settings.RECIPE_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.RECIPE_MAX_PAGE_SIZE
+
+
+class RecipeAttrCursorPagination(RecipeCursorPagination):
+    """Keyset pagination for tags and ingredients ordered by name."""
+
+    ordering = ("-name", "-id")
@@ -0,0 +1,40 @@
+"""
+Prefetch helpers for recipe APIs
+"""
+from functools import lru_cache
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+@lru_cache(maxsize=None)
+def _nested_specs(serializer_class):
+    """Collect (source, model, fields) for nested many model fields."""
+    specs = []
+    for field in serializer_class().fields.values():
+        if not isinstance(field, serializers.ListSerializer):
+            continue
+        child = field.child
+        if not isinstance(child, serializers.ModelSerializer):
+            continue
+        sources = tuple(
+            f.source for f in child.fields.values() if f.source != "*"
+        )
+        specs.append((field.source, child.Meta.model, sources))
+    return tuple(specs)
+
+
+def get_prefetches(serializer_class):
+    """Return Prefetch objects needed to render serializer_class."""
+    return [
+        Prefetch(source, queryset=model.objects.only(*fields))
+        for source, model, fields in _nested_specs(serializer_class)
+    ]
+
+
+def prefetch_for_serializer(queryset, serializer_class):
+    """Prefetch the relations serializer_class renders as nested lists."""
+    prefetches = get_prefetches(serializer_class)
+    if not prefetches:
+        return queryset
+    return queryset.prefetch_related(*prefetches)
@@ -0,0 +1,123 @@
+"""
+Store of resized WebP renditions of recipe images.
+
+Renditions live next to the original upload, named after its file name
+and the rendition width, e.g. uploads/recipe/<name>_400w.webp.
+Widths are limited to RECIPE_IMAGE_RENDITIONS. Presets are generated
+when an upload is processed and any other width on first request.
+With a shared cache (see CACHE_SHARED), which renditions exist is
+cached, so serving one rarely touches storage before handing it off.
+A per-process cache isn't used, since deletions in other processes
+would never reach it.
+"""
+import io
+import os
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image, ImageOps
+
+from core.cache import get_cached
+from core.models import Recipe
+from core.storage import replace_file
+
+
+RENDITION_RE = re.compile(r"^(?P<stem>.+)_(?P<width>[0-9]+)w\.webp$")
+
+
+def image_storage():
+    return Recipe._meta.get_field("image").storage
+
+
+def rendition_name(image_name, width):
+    """Return the storage name of image_name's rendition of width."""
+    return f"{os.path.splitext(image_name)[0]}_{width}w.webp"
+
+
+def rendition_stem(name):
+    """Return the file name stem of a rendition's source, or None."""
+    match = RENDITION_RE.match(os.path.basename(name))
+    return match.group("stem") if match else None
+
+
+def _cache_key(name):
+    return f"rendition:{name}"
+
+
+def _remember(name):
+    if settings.CACHE_SHARED:
+        cache.set(_cache_key(name), True, None)
+
+
+def _flatten(image, output_format):
+    """Convert image to a mode output_format can encode."""
+    if output_format == "JPEG":
+        return image.convert("RGB") if image.mode != "RGB" else image
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def encode(image, output_format):
+    """Encode image as output_format without any metadata."""
+    buffer = io.BytesIO()
+    _flatten(image, output_format).save(
+        buffer, output_format, quality=settings.RECIPE_IMAGE_QUALITY
+    )
+    return buffer.getvalue()
+
+
+def open_image(image_name):
+    """Decode a stored image upright. Returns (image, format)."""
+    with image_storage().open(image_name, "rb") as f:
+        with Image.open(f) as source:
+            image = ImageOps.exif_transpose(source)
+            image.load()
+            return image, source.format
+
+
+def save_rendition(image, image_name, width):
+    """Save a rendition of the decoded image and return its name."""
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+
+    # Written in place rather than saved, so storages that pick their own
+    # names (see ContentAddressedStorage) keep the rendition's name.
+    name = rendition_name(image_name, width)
+    replace_file(image_storage(), name, encode(image, "WEBP"))
+    _remember(name)
+    return name
+
+
+def get_rendition(image_name, width):
+    """
+    Return the name of image_name's rendition of width, generating it
+    if it doesn't exist yet.
+
+    Raises FileNotFoundError when the original doesn't exist.
+    """
+    name = rendition_name(image_name, width)
+    if settings.CACHE_SHARED and get_cached(_cache_key(name), "rendition"):
+        return name
+    if image_storage().exists(name):
+        _remember(name)
+        return name
+    if not image_storage().exists(image_name):
+        raise FileNotFoundError(image_name)
+    image, _ = open_image(image_name)
+    return save_rendition(image, image_name, width)
+
+
+def delete_rendition(name):
+    """Delete a rendition file and forget that it exists."""
+    image_storage().delete(name)
+    cache.delete(_cache_key(name))
+
+
+def delete_renditions(image_name):
+    """Delete every configured rendition of image_name."""
+    for width in settings.RECIPE_IMAGE_RENDITIONS:
+        delete_rendition(rendition_name(image_name, width))
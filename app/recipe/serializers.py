@@ -1,13 +1,45 @@
 """
 Serializers for recipe APIs
 """
+import os
 
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.utils.translation import gettext as _t
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from core.models import Recipe, Tag, Ingredient
+from core.signals import invalidate_user
+from recipe.prefetch import prefetch_for_serializer
 
 
-class TagSerializer(serializers.ModelSerializer):
+class UniqueNameMixin:
+    """
+    Reject renaming to a name the user already has.
+
+    Only applies to top-level use; nested under a recipe, existing names
+    are looked up instead of created.
+    """
+    def validate_name(self, value):
+        if self.parent is not None:
+            return value
+        queryset = self.Meta.model.objects.filter(
+            user=self.context["request"].user, name=value
+        )
+        if self.instance is not None:
+            queryset = queryset.exclude(pk=self.instance.pk)
+        if queryset.exists():
+            raise serializers.ValidationError(
+                _t("An item with this name already exists.")
+            )
+        return value
+
+
+class TagSerializer(UniqueNameMixin, serializers.ModelSerializer):
     """
     Serializer for the Tag model
     """
@@ -17,7 +49,7 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(UniqueNameMixin, serializers.ModelSerializer):
     """
     Serializer for the Ingredient model
     """
@@ -39,23 +71,41 @@ class RecipeSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "time_minutes", "price", "link", "tags", "ingredients"]
         read_only_fields = ["id"]
 
-    def _get_or_create_tags(self, tags, recipe):
-        auth_user = self.context["request"].user
-        for tag in tags:
-            tag_obj, _ = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag
+    def _get_or_create_by_name(self, model, user, names):
+        """Map each name to an object owned by user, creating missing ones."""
+        if not names:
+            return {}
+
+        queryset = model.objects.filter(user=user).order_by("id")
+        found = {}
+        for obj in queryset.filter(name__in=names):
+            found.setdefault(obj.name, obj)
+
+        missing = [name for name in names if name not in found]
+        if missing:
+            model.objects.bulk_create(
+                [model(user=user, name=name) for name in missing],
+                ignore_conflicts=True,
             )
-            recipe.tags.add(tag_obj)
+            for obj in queryset.filter(name__in=missing):
+                found.setdefault(obj.name, obj)
 
-    def _get_or_create_ingredients(self, ingredients, recipe):
+        return found
+
+    def _get_or_create_attrs(self, model, items):
+        """Get or create named objects for the authed user in bulk."""
         auth_user = self.context["request"].user
-        for ingredient in ingredients:
-            ingredient_obj, _ = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient
-            )
-            recipe.ingredients.add(ingredient_obj)
+        names = list(dict.fromkeys(item["name"] for item in items))
+        found = self._get_or_create_by_name(model, auth_user, names)
+        return [found[name] for name in names]
+
+    def _get_or_create_tags(self, tags, recipe):
+        recipe.tags.add(*self._get_or_create_attrs(Tag, tags))
+
+    def _get_or_create_ingredients(self, ingredients, recipe):
+        recipe.ingredients.add(
+            *self._get_or_create_attrs(Ingredient, ingredients)
+        )
 
     def create(self, validated_data):
         """Create a recipe."""
@@ -72,35 +122,210 @@ class RecipeSerializer(serializers.ModelSerializer):
         tags = validated_data.pop("tags", None)
         ingredients = validated_data.pop("ingredients", None)
 
-        if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+        with transaction.atomic():
+            if tags is not None:
+                instance.tags.set(self._get_or_create_attrs(Tag, tags))
 
-        if ingredients is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients, instance)
+            if ingredients is not None:
+                instance.ingredients.set(
+                    self._get_or_create_attrs(Ingredient, ingredients)
+                )
 
-        for k, v in validated_data.items():
-            setattr(instance, k, v)
+            for k, v in validated_data.items():
+                setattr(instance, k, v)
 
-        instance.save()
+            instance.save()
         return instance
 
 
+class RecipeListSerializer(serializers.ListSerializer):
+    """
+    Serializer for creating many recipes at once.
+    """
+    batch_size = 1000
+
+    def _link(self, field, model, recipes, items):
+        """Attach nested objects to recipes with one bulk insert."""
+        user = recipes[0].user if recipes else None
+        names = list(dict.fromkeys(
+            nested["name"] for nested_items in items for nested in nested_items
+        ))
+        found = self.child._get_or_create_by_name(model, user, names)
+
+        through = getattr(Recipe, field).through
+        target = f"{model._meta.model_name}_id"
+        rows = {
+            (recipe.id, found[nested["name"]].id)
+            for recipe, nested_items in zip(recipes, items)
+            for nested in nested_items
+        }
+        through.objects.bulk_create(
+            [through(recipe_id=r_id, **{target: t_id}) for r_id, t_id in rows],
+            batch_size=self.batch_size,
+        )
+
+    def create(self, validated_data):
+        """Create recipes and their tags/ingredients in bulk."""
+        tags = [item.pop("tags", []) for item in validated_data]
+        ingredients = [item.pop("ingredients", []) for item in validated_data]
+
+        with transaction.atomic():
+            recipes = Recipe.objects.bulk_create(
+                [Recipe(**item) for item in validated_data],
+                batch_size=self.batch_size,
+            )
+            self._link("tags", Tag, recipes, tags)
+            self._link("ingredients", Ingredient, recipes, ingredients)
+            Recipe.objects.filter(
+                id__in=[recipe.id for recipe in recipes]
+            ).update_search_vector()
+            if recipes:
+                invalidate_user(recipes[0].user_id)
+
+        queryset = prefetch_for_serializer(
+            Recipe.objects.filter(id__in=[r.id for r in recipes]),
+            type(self.child),
+        )
+        by_id = {recipe.id: recipe for recipe in queryset}
+        return [by_id[recipe.id] for recipe in recipes]
+
+
+URL_MAP_SCHEMA = {
+    "type": "object",
+    "additionalProperties": {"type": "string", "format": "uri"},
+}
+
+
+def recipe_image_url(context, recipe, width=None):
+    """
+    Return the URL serving a recipe's image, or a rendition of it.
+
+    Responses are cached by clients for MEDIA_CACHE_MAX_AGE, so the URL
+    carries the stored name's stem, the content hash with
+    ContentAddressedStorage, as a version that changes with the image.
+    """
+    url = reverse("recipe:recipe-image", args=[recipe.pk])
+    params = {"v": os.path.splitext(os.path.basename(recipe.image.name))[0]}
+    if width is not None:
+        params["width"] = width
+    url = f"{url}?{urlencode(params)}"
+    request = context.get("request")
+    return request.build_absolute_uri(url) if request else url
+
+
+class RecipeImageField(serializers.ImageField):
+    """
+    Image upload field represented by its authenticated image URL.
+    """
+    def to_representation(self, value):
+        if not value:
+            return None
+        return recipe_image_url(self.context, value.instance)
+
+
+@extend_schema_field(URL_MAP_SCHEMA)
+class ImageVariantsField(serializers.Field):
+    """
+    Read-only map of processed image variant labels to their URLs.
+    """
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        return {
+            label: recipe_image_url(
+                self.context, recipe, settings.RECIPE_IMAGE_SIZES[label]
+            )
+            for label in recipe.image_variants
+            if label in settings.RECIPE_IMAGE_SIZES
+        }
+
+
+def rendition_urls(context, recipe):
+    """
+    Return {width: URL} of the renditions of recipe's image, which are
+    only served once it is processed.
+    """
+    if not recipe.image or recipe.image_status != Recipe.ImageStatus.READY:
+        return {}
+    return {
+        width: recipe_image_url(context, recipe, width)
+        for width in settings.RECIPE_IMAGE_RENDITIONS
+    }
+
+
+@extend_schema_field(URL_MAP_SCHEMA)
+class ImageRenditionsField(serializers.Field):
+    """
+    Read-only map of rendition widths to URLs.
+
+    Renditions are generated on first request.
+    """
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        return {
+            str(width): url
+            for width, url in rendition_urls(self.context, recipe).items()
+        }
+
+
+@extend_schema_field(OpenApiTypes.STR)
+class ImageSrcsetField(serializers.Field):
+    """
+    Read-only srcset attribute value listing the image renditions.
+    """
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        return ", ".join(
+            f"{url} {width}w"
+            for width, url in rendition_urls(self.context, recipe).items()
+        )
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """
     Serialzier for detailed recipe view.
     """
+    # Images are only accepted through the upload-image action, which
+    # limits and processes them.
+    image = RecipeImageField(read_only=True)
+    image_variants = ImageVariantsField()
+    image_renditions = ImageRenditionsField()
+    image_srcset = ImageSrcsetField()
+
     class Meta(RecipeSerializer.Meta):
-        fields = RecipeSerializer.Meta.fields + ["description", "image"]
+        fields = RecipeSerializer.Meta.fields + [
+            "description",
+            "image",
+            "image_status",
+            "image_variants",
+            "image_renditions",
+            "image_srcset",
+        ]
+        read_only_fields = RecipeSerializer.Meta.read_only_fields + [
+            "image_status"
+        ]
+        list_serializer_class = RecipeListSerializer
 
 
 class RecipeImageSerializer(serializers.ModelSerializer):
     """
     Serialzier for uploading images to recipes.
     """
+    image = RecipeImageField()
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Recipe
-        fields = ["id", "image"]
-        read_only_fields = ["id"]
-        extra_kwargs = {"image": {"required": "True"}}
+        fields = ["id", "image", "image_status", "image_variants"]
+        read_only_fields = ["id", "image_status"]
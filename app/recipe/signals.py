@@ -0,0 +1,36 @@
+"""
+Signal handlers for the recipe app.
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core import tasks
+from core.models import Recipe
+from recipe.images import release_image
+
+
+def _stored_image(instance):
+    # Read the raw attribute so deferred images aren't loaded.
+    image = instance.__dict__.get("image")
+    return getattr(image, "name", image)
+
+
+@receiver(post_init, sender=Recipe)
+def remember_stored_image(sender, instance, **kwargs):
+    instance._stored_image = _stored_image(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def release_replaced_image(sender, instance, **kwargs):
+    """Release the previous image of a recipe once it's replaced."""
+    previous = instance._stored_image
+    instance._stored_image = _stored_image(instance)
+    if previous and previous != instance._stored_image:
+        tasks.submit(release_image, previous)
+
+
+@receiver(post_delete, sender=Recipe)
+def release_deleted_image(sender, instance, **kwargs):
+    """Release the image of a deleted recipe."""
+    if instance._stored_image:
+        tasks.submit(release_image, instance._stored_image)
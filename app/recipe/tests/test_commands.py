@@ -0,0 +1,224 @@
+"""
+Tests for recipe management commands
+"""
+import datetime
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Recipe, Tag, Ingredient
+from core.utils import create_user
+from recipe import renditions
+from recipe.management.commands import explain_queries
+from recipe.views import RecipeViewSet
+
+
+class ExplainQueriesTests(TestCase):
+    """Tests for the explain_queries command."""
+
+    def setUp(self):
+        self.user = create_user("user@example.com", "testpass123")
+        recipe = Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price=Decimal("1")
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name="Hot"))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name="Salt")
+        )
+
+    def test_indexed_queries_pass(self):
+        """Test every list query can be served by an index."""
+        out = StringIO()
+
+        call_command("explain_queries", stdout=out)
+
+        self.assertIn("No plan regressions.", out.getvalue())
+        self.assertIn("recipe-list-tags", out.getvalue())
+        self.assertIn("recipe-list-time", out.getvalue())
+
+    def test_range_queries_use_their_indexes(self):
+        """Test range filters with ordering scan the matching index."""
+        command = explain_queries.Command()
+        options = {"analyze": False, "planner_defaults": False}
+        for params, index in [
+            ({"min_time": 10, "ordering": "-time_minutes"},
+             "recipe_user_time_idx"),
+            ({"min_price": "1.00", "max_price": "9.00", "ordering": "price"},
+             "recipe_user_price_idx"),
+        ]:
+            queryset = explain_queries.list_queryset(
+                RecipeViewSet, self.user, params
+            )
+            plan = command._explain(queryset, options)
+            nodes = explain_queries.plan_nodes(plan)
+
+            self.assertIn(index, explain_queries.plan_indexes(plan))
+            self.assertNotIn("Seq Scan", [n["Node Type"] for n in nodes])
+
+    def test_cost_regression_reported(self):
+        """Test plans costlier than the baseline are reported."""
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as baseline:
+            json.dump({"recipe-list": 0.01}, baseline)
+            baseline.flush()
+
+            with self.assertRaises(CommandError):
+                call_command(
+                    "explain_queries",
+                    baseline=baseline.name,
+                    stdout=StringIO(),
+                )
+
+    def test_saves_baseline(self):
+        with tempfile.NamedTemporaryFile("r", suffix=".json") as baseline:
+            call_command(
+                "explain_queries",
+                save_baseline=baseline.name,
+                stdout=StringIO(),
+            )
+
+            costs = json.load(baseline)
+
+        self.assertIn("tag-list-assigned", costs)
+
+
+@override_settings(TASKS_EAGER=True)
+class ProcessRecipeImagesTests(TestCase):
+    """Tests for the process_recipe_images command."""
+
+    @patch("recipe.management.commands.process_recipe_images."
+           "process_recipe_image")
+    def test_processes_pending_images(self, patched_process):
+        user = create_user("user@example.com", "testpass123")
+        statuses = ["pending", "failed", "ready", ""]
+        recipes = [
+            Recipe.objects.create(
+                user=user,
+                title=image_status or "none",
+                time_minutes=5,
+                price=Decimal("1"),
+                image_status=image_status,
+            )
+            for image_status in statuses
+        ]
+
+        call_command("process_recipe_images", stdout=StringIO())
+        patched_process.assert_called_once_with(recipes[0].id)
+
+        patched_process.reset_mock()
+        call_command(
+            "process_recipe_images", retry_failed=True, stdout=StringIO()
+        )
+        self.assertEqual(
+            sorted(c.args[0] for c in patched_process.call_args_list),
+            [recipes[0].id, recipes[1].id],
+        )
+
+    @patch("recipe.management.commands.process_recipe_images."
+           "process_recipe_image")
+    def test_retries_stuck_images(self, patched_process):
+        """Test images left processing by a killed worker are retried."""
+        user = create_user("user@example.com", "testpass123")
+        now = timezone.now()
+        recipes = [
+            Recipe.objects.create(
+                user=user,
+                title="Soup",
+                time_minutes=5,
+                price=Decimal("1"),
+                image_status="processing",
+                image_status_changed=changed,
+            )
+            for changed in [now, now - datetime.timedelta(hours=1)]
+        ]
+
+        call_command(
+            "process_recipe_images", stuck_after=600, stdout=StringIO()
+        )
+
+        patched_process.assert_called_once_with(recipes[1].id)
+
+    @patch("recipe.management.commands.process_recipe_images."
+           "process_recipe_image")
+    def test_skips_recently_queued_images(self, patched_process):
+        """Test images queued moments ago are left to their task."""
+        user = create_user("user@example.com", "testpass123")
+        now = timezone.now()
+        recipes = [
+            Recipe.objects.create(
+                user=user,
+                title="Soup",
+                time_minutes=5,
+                price=Decimal("1"),
+                image_status="pending",
+                image_status_changed=changed,
+            )
+            for changed in [now, now - datetime.timedelta(hours=1)]
+        ]
+
+        call_command(
+            "process_recipe_images", pending_after=600, stdout=StringIO()
+        )
+
+        patched_process.assert_called_once_with(recipes[1].id)
+
+
+class GcRecipeImagesTests(TestCase):
+    """Tests for the gc_recipe_images command."""
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        override = override_settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(self.media.cleanup)
+
+        self.storage = renditions.image_storage()
+        user = create_user("user@example.com", "testpass123")
+        self.kept = self.storage.save(
+            "uploads/recipe/kept.jpg", ContentFile(b"kept")
+        )
+        Recipe.objects.create(
+            user=user,
+            title="Soup",
+            time_minutes=5,
+            price=Decimal("1"),
+            image=self.kept,
+        )
+        self.files = {
+            "kept_rendition": renditions.rendition_name(self.kept, 200),
+            "orphan": "uploads/recipe/orphan.jpg",
+            "orphan_rendition": "uploads/recipe/orphan_200w.webp",
+        }
+        for name in self.files.values():
+            with self.storage.open(name, "wb") as f:
+                f.write(b"data")
+
+    def test_deletes_orphans(self):
+        out = StringIO()
+
+        call_command("gc_recipe_images", min_age=-60, stdout=out)
+
+        self.assertTrue(self.storage.exists(self.kept))
+        self.assertTrue(self.storage.exists(self.files["kept_rendition"]))
+        self.assertFalse(self.storage.exists(self.files["orphan"]))
+        self.assertFalse(self.storage.exists(self.files["orphan_rendition"]))
+        self.assertIn("Deleted 2 file(s)", out.getvalue())
+
+    def test_keeps_recent_files_and_dry_run(self):
+        call_command("gc_recipe_images", stdout=StringIO())
+        out = StringIO()
+        call_command(
+            "gc_recipe_images", min_age=-60, dry_run=True, stdout=out
+        )
+
+        for name in self.files.values():
+            self.assertTrue(self.storage.exists(name))
+        self.assertIn("Would delete 2 file(s)", out.getvalue())
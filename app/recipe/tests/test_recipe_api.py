@@ -1,10 +1,17 @@
+import hashlib
+import io
 import tempfile
 import os
 from decimal import Decimal
+from unittest.mock import patch
 
 from PIL import Image
 
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
@@ -12,10 +19,15 @@ from rest_framework.test import APIClient
 
 from core.models import Recipe, Tag, Ingredient
 from core.utils import create_user as _create_user
+from recipe.filters import trigram_available
+from recipe.pagination import RecipeCursorPagination
+from recipe import images
+from recipe.renditions import delete_renditions, rendition_name
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
 
 RECIPES_URL = reverse("recipe:recipe-list")
+BULK_URL = reverse("recipe:recipe-bulk")
 
 
 def detail_url(recipe_id):
@@ -27,6 +39,10 @@ def image_upload_url(recipe_id):
     return reverse("recipe:recipe-upload-image", args=[recipe_id])
 
 
+def image_url_for(recipe_id):
+    return reverse("recipe:recipe-image", args=[recipe_id])
+
+
 def create_recipe(user, **params):
     defaults = {
         "title": "Sample recipe title",
@@ -40,6 +56,18 @@ def create_recipe(user, **params):
     return recipe
 
 
+def page_ids(client, params, max_pages=100):
+    """Return the recipe ids on every page, following the next links."""
+    res = client.get(RECIPES_URL, params)
+    ids = [r["id"] for r in res.data["results"]]
+    for _ in range(max_pages):
+        if not res.data["next"]:
+            return ids
+        res = client.get(res.data["next"])
+        ids += [r["id"] for r in res.data["results"]]
+    raise AssertionError(f"Still paging after {max_pages} pages.")
+
+
 def create_user(email="user@example.com", password="testpass123", **params):
     """Create and return a new user"""
     return _create_user(email, password, **params)
@@ -76,7 +104,7 @@ class PrivateRecipeAPITests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_recipe_list_limited_to_user(self):
         other_user = create_user(email="other@example.com", password="password321")
@@ -88,7 +116,7 @@ class PrivateRecipeAPITests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_get_recipe_detail(self):
         "Test get detailed view for specific recipe."
@@ -232,6 +260,43 @@ class PrivateRecipeAPITests(TestCase):
             ).exists()
             self.assertTrue(exists)
 
+    def test_create_recipe_nested_query_count_constant(self):
+        """Test nested tags and ingredients are written in bulk."""
+        def payload(count):
+            return {
+                "title": f"Recipe {count}",
+                "time_minutes": 10,
+                "price": Decimal("1.00"),
+                "tags": [{"name": f"t{i}"} for i in range(count)],
+                "ingredients": [{"name": f"i{i}"} for i in range(count)],
+            }
+        Tag.objects.create(user=self.user, name="t0")
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(RECIPES_URL, payload(2), format="json")
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.post(RECIPES_URL, payload(30), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 30)
+        recipe = Recipe.objects.get(id=res.data["id"])
+        self.assertEqual(recipe.tags.count(), 30)
+        self.assertEqual(recipe.ingredients.count(), 30)
+
+    def test_create_recipe_duplicate_tag_names(self):
+        """Test repeated tag names in a payload map to one tag."""
+        payload = {
+            "title": "Soup",
+            "time_minutes": 10,
+            "price": Decimal("1.00"),
+            "tags": [{"name": "Hot"}, {"name": "Hot"}],
+        }
+        res = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
     def test_create_tag_on_update(self):
         """Test create tag when updating recipe"""
         recipe = create_recipe(user=self.user)
@@ -259,6 +324,45 @@ class PrivateRecipeAPITests(TestCase):
         self.assertIn(tag_lunch, recipe.tags.all())
         self.assertNotIn(tag_breakfast, recipe.tags.all())
 
+    def test_update_unchanged_tags_skips_writes(self):
+        """Test re-sending the same tags doesn't rewrite the M2M table."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name="Lunch"))
+        through = Recipe.tags.through._meta.db_table
+
+        payload = {"tags": [{"name": "Lunch"}]}
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.patch(
+                detail_url(recipe.id), payload, format="json"
+            )
+        writes = [
+            q["sql"] for q in ctx.captured_queries
+            if through in q["sql"]
+            and q["sql"].startswith(("INSERT", "DELETE"))
+        ]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(writes, [])
+        self.assertEqual(recipe.tags.count(), 1)
+
+    def test_update_tags_applies_delta(self):
+        """Test only changed tags are removed or added on update."""
+        tag_keep = Tag.objects.create(user=self.user, name="Keep")
+        tag_drop = Tag.objects.create(user=self.user, name="Drop")
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag_keep, tag_drop)
+        through = Recipe.tags.through
+        keep_row = through.objects.get(recipe=recipe, tag=tag_keep)
+
+        payload = {"tags": [{"name": "Keep"}, {"name": "New"}]}
+        res = self.client.patch(detail_url(recipe.id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(recipe.tags.values_list("name", flat=True)), {"Keep", "New"}
+        )
+        self.assertTrue(through.objects.filter(id=keep_row.id).exists())
+
     def test_clear_recipe_tags(self):
         """Test cleating a recipes tags."""
         tag = Tag.objects.create(user=self.user, name="Dessert")
@@ -375,10 +479,10 @@ class PrivateRecipeAPITests(TestCase):
         s3 = RecipeSerializer(recipe3)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
-        self.assertEqual(len(res.data), 2)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertIn(s2.data, res.data["results"])
+        self.assertNotIn(s3.data, res.data["results"])
+        self.assertEqual(len(res.data["results"]), 2)
 
     def test_filter_by_ingredients(self):
         """Test filtering recipes by ingredients."""
@@ -398,11 +502,483 @@ class PrivateRecipeAPITests(TestCase):
         s3 = RecipeSerializer(recipe3)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
-        self.assertEqual(len(res.data), 2)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertIn(s2.data, res.data["results"])
+        self.assertNotIn(s3.data, res.data["results"])
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_filter_by_all_tags(self):
+        """Test match=all keeps recipes having every requested tag."""
+        tag1 = Tag.objects.create(user=self.user, name="Vegan")
+        tag2 = Tag.objects.create(user=self.user, name="Quick")
+        recipe1 = create_recipe(user=self.user, title="Salad")
+        recipe2 = create_recipe(user=self.user, title="Stew")
+        recipe1.tags.add(tag1, tag2)
+        recipe2.tags.add(tag1)
+
+        params = {"tags": f"{tag1.id},{tag2.id}", "match": "all"}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r["id"] for r in res.data["results"]], [recipe1.id]
+        )
+
+    def test_filter_no_duplicates_without_distinct(self):
+        """Test recipes matching several tags are listed once."""
+        tag1 = Tag.objects.create(user=self.user, name="Vegan")
+        tag2 = Tag.objects.create(user=self.user, name="Quick")
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag1, tag2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(
+                RECIPES_URL, {"tags": f"{tag1.id},{tag2.id}"}
+            )
+
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertFalse(
+            any("DISTINCT" in q["sql"] for q in ctx.captured_queries)
+        )
+        self.assertTrue(
+            any("EXISTS" in q["sql"] for q in ctx.captured_queries)
+        )
+
+    def _create_tagged_recipe(self, title):
+        recipe = create_recipe(user=self.user, title=title)
+        recipe.tags.add(Tag.objects.create(user=self.user, name=title))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name=title)
+        )
+        return recipe
+
+    def test_filter_by_time_and_price_range(self):
+        """Test min/max filters combine with each other and with tags."""
+        tag = Tag.objects.create(user=self.user, name="Quick")
+        match = create_recipe(
+            user=self.user, time_minutes=20, price=Decimal("4.00")
+        )
+        match.tags.add(tag)
+        create_recipe(user=self.user, time_minutes=20, price=Decimal("4.00"))
+        slow = create_recipe(
+            user=self.user, time_minutes=90, price=Decimal("4.00")
+        )
+        pricey = create_recipe(
+            user=self.user, time_minutes=20, price=Decimal("40.00")
+        )
+        slow.tags.add(tag)
+        pricey.tags.add(tag)
+
+        params = {
+            "min_time": 10,
+            "max_time": 30,
+            "max_price": "10.00",
+            "tags": str(tag.id),
+        }
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in res.data["results"]], [match.id])
+
+    def test_order_by_price(self):
+        cheap = create_recipe(user=self.user, price=Decimal("1.00"))
+        dear = create_recipe(user=self.user, price=Decimal("9.00"))
+        mid = create_recipe(user=self.user, price=Decimal("5.00"))
+
+        res = self.client.get(RECIPES_URL, {"ordering": "-price"})
+        asc = self.client.get(RECIPES_URL, {"ordering": "price"})
+
+        self.assertEqual(
+            [r["id"] for r in res.data["results"]], [dear.id, mid.id, cheap.id]
+        )
+        self.assertEqual(
+            [r["id"] for r in asc.data["results"]], [cheap.id, mid.id, dear.id]
+        )
+
+    def test_order_by_time_paginates(self):
+        for minutes in [5, 50, 5, 20, 50]:
+            create_recipe(user=self.user, time_minutes=minutes)
+        expected = list(
+            Recipe.objects.order_by("time_minutes", "id").values_list(
+                "id", flat=True
+            )
+        )
+
+        res = self.client.get(
+            RECIPES_URL, {"ordering": "time_minutes", "page_size": 2}
+        )
+        ids = [r["id"] for r in res.data["results"]]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            ids += [r["id"] for r in res.data["results"]]
+
+        self.assertEqual(ids, expected)
+
+    def test_ordering_ties_paged_past_offset_cutoff(self):
+        """Test more equal values than DRF's offset cutoff page to the end."""
+        count = RecipeCursorPagination.offset_cutoff + 300
+        Recipe.objects.bulk_create(
+            Recipe(
+                user=self.user, title=f"r{i}", time_minutes=5,
+                price=Decimal("1.00"),
+            )
+            for i in range(count)
+        )
+
+        ids = page_ids(
+            self.client, {"ordering": "-time_minutes", "page_size": 100}
+        )
+
+        self.assertEqual(
+            ids,
+            list(Recipe.objects.order_by("-id").values_list("id", flat=True)),
+        )
+
+    def test_previous_links_page_back(self):
+        """Test previous links return the earlier pages among ties."""
+        for minutes in [5, 5, 5, 5, 20]:
+            create_recipe(user=self.user, time_minutes=minutes)
+        params = {"ordering": "time_minutes", "page_size": 2}
+        pages = [self.client.get(RECIPES_URL, params).data]
+        while pages[-1]["next"]:
+            pages.append(self.client.get(pages[-1]["next"]).data)
+
+        back = [pages[-1]]
+        while back[-1]["previous"]:
+            back.append(self.client.get(back[-1]["previous"]).data)
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(
+            [page["results"] for page in reversed(back)],
+            [page["results"] for page in pages],
+        )
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected."""
+        res = self.client.get(RECIPES_URL, {"cursor": "cD1bImEiXQ=="})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_range_filters(self):
+        """Test malformed or inverted bounds are rejected."""
+        for params in [
+            {"min_time": "soon"},
+            {"max_price": "-1"},
+            {"min_price": "5", "max_price": "1"},
+            {"ordering": "title"},
+            {"tags": "1", "match": "every"},
+        ]:
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(
+                res.status_code, status.HTTP_400_BAD_REQUEST, params
+            )
+
+    def test_list_query_count_constant(self):
+        """Test listing recipes doesn't issue queries per recipe."""
+        self._create_tagged_recipe("r0")
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(RECIPES_URL)
+
+        for i in range(1, 5):
+            self._create_tagged_recipe(f"r{i}")
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data["results"]), 5)
+        self.assertEqual(len(single), len(many))
+
+    def test_detail_prefetches_nested(self):
+        """Test retrieving a recipe loads nested relations in bulk."""
+        recipe = self._create_tagged_recipe("r0")
+        recipe.tags.add(Tag.objects.create(user=self.user, name="extra"))
+
+        with self.assertNumQueries(3):
+            res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(len(res.data["tags"]), 2)
+        self.assertEqual(len(res.data["ingredients"]), 1)
+
+    def test_list_paginated_by_cursor(self):
+        """Test recipes are paged newest first with stable cursors."""
+        recipes = [
+            create_recipe(user=self.user, title=f"r{i}") for i in range(3)
+        ]
+
+        res = self.client.get(RECIPES_URL, {"page_size": 2})
+        first_ids = [r["id"] for r in res.data["results"]]
+        create_recipe(user=self.user, title="inserted")
+        res_next = self.client.get(res.data["next"])
+        next_ids = [r["id"] for r in res_next.data["results"]]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(first_ids, [recipes[2].id, recipes[1].id])
+        self.assertEqual(next_ids, [recipes[0].id])
+        self.assertIsNone(res_next.data["next"])
+
+    def _bulk_payload(self, count):
+        return [
+            {
+                "title": f"Bulk {i}",
+                "time_minutes": i,
+                "price": Decimal("1.50"),
+                "tags": [{"name": "Shared"}, {"name": f"tag{i}"}],
+                "ingredients": [{"name": "Salt"}],
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create_recipes(self):
+        """Test creating many recipes with nested objects at once."""
+        Tag.objects.create(user=self.user, name="Shared")
+
+        res = self.client.post(BULK_URL, self._bulk_payload(3), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([r["title"] for r in res.data], [
+            "Bulk 0", "Bulk 1", "Bulk 2"
+        ])
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 3)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 1)
+        for recipe in recipes:
+            self.assertEqual(recipe.tags.count(), 2)
+            self.assertEqual(recipe.ingredients.count(), 1)
+        self.assertEqual(len(res.data[0]["tags"]), 2)
+
+    def test_bulk_create_query_count_bounded(self):
+        """Test bulk creation doesn't issue queries per recipe."""
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(BULK_URL, self._bulk_payload(2), format="json")
+        for model in (Recipe, Tag, Ingredient):
+            model.objects.all().delete()
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.post(
+                BULK_URL, self._bulk_payload(40), format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(few), len(many))
+
+    def test_bulk_create_invalid_item_rolls_back(self):
+        """Test one invalid item rejects the whole batch."""
+        payload = self._bulk_payload(2)
+        del payload[1]["title"]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("title", res.data[1])
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_create_too_many_items(self):
+        """Test bulk requests over the item limit are rejected."""
+        res = self.client.post(BULK_URL, self._bulk_payload(3), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+
+class RecipeSearchTests(TestCase):
+    """Test searching recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_search_ranks_title_above_description(self):
+        in_description = create_recipe(
+            user=self.user, title="Stew", description="Hearty curry base"
+        )
+        in_title = create_recipe(
+            user=self.user, title="Green curry", description="Spicy"
+        )
+        create_recipe(user=self.user, title="Pancakes")
+
+        res = self.client.get(RECIPES_URL, {"search": "curries"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r["id"] for r in res.data["results"]],
+            [in_title.id, in_description.id],
+        )
+
+    def test_search_updated_on_save(self):
+        recipe = create_recipe(user=self.user, title="Pancakes")
+        recipe.title = "Waffles"
+        recipe.save()
+
+        res = self.client.get(RECIPES_URL, {"search": "waffle"})
+
+        self.assertEqual([r["id"] for r in res.data["results"]], [recipe.id])
+
+    def test_search_bulk_created(self):
+        payload = [
+            {"title": "Lentil soup", "time_minutes": 5, "price": "1.00"},
+            {"title": "Toast", "time_minutes": 1, "price": "0.50"},
+        ]
+        self.client.post(BULK_URL, payload, format="json")
+
+        res = self.client.get(RECIPES_URL, {"search": "lentils"})
+
+        self.assertEqual(
+            [r["title"] for r in res.data["results"]], ["Lentil soup"]
+        )
+
+    def test_search_paginates_by_rank(self):
+        for i in range(5):
+            create_recipe(
+                user=self.user,
+                title="Curry" if i % 2 else "Rice",
+                description="curry " * i,
+            )
+
+        params = {"search": "curry", "page_size": 2}
+        res = self.client.get(RECIPES_URL, params)
+        ids = [r["id"] for r in res.data["results"]]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            ids += [r["id"] for r in res.data["results"]]
+
+        everything = self.client.get(RECIPES_URL, {"search": "curry"})
+        self.assertEqual(
+            ids, [r["id"] for r in everything.data["results"]]
+        )
+        self.assertEqual(len(ids), 4)
+
+    def test_search_equal_ranks_paged_past_offset_cutoff(self):
+        """Test more equal ranks than DRF's offset cutoff page to the end."""
+        count = RecipeCursorPagination.offset_cutoff + 300
+        Recipe.objects.bulk_create(
+            Recipe(
+                user=self.user, title="Curry", time_minutes=5,
+                price=Decimal("1.00"),
+            )
+            for _ in range(count)
+        )
+        Recipe.objects.update_search_vector()
+
+        ids = page_ids(self.client, {"search": "curry", "page_size": 100})
+
+        self.assertEqual(
+            ids,
+            list(Recipe.objects.order_by("-id").values_list("id", flat=True)),
+        )
+
+    def test_search_limited_to_user(self):
+        other = create_user(email="other@example.com")
+        create_recipe(user=other, title="Curry")
+
+        res = self.client.get(RECIPES_URL, {"search": "curry"})
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_fuzzy_search(self):
+        recipe = create_recipe(user=self.user, title="Spaghetti")
+        create_recipe(user=self.user, title="Toast")
+        params = {"search": "spagetti", "search_mode": "fuzzy"}
+
+        res = self.client.get(RECIPES_URL, params)
+
+        if trigram_available():
+            self.assertEqual(
+                [r["id"] for r in res.data["results"]], [recipe.id]
+            )
+        else:
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_search_mode(self):
+        params = {"search": "curry", "search_mode": "regex"}
+
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(CACHE_SHARED=True)
+class ConditionalRecipeListTests(TestCase):
+    """Test conditional GET on the recipe list."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        create_recipe(user=self.user)
+
+    def test_list_has_validators(self):
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", res)
+        self.assertNotIn("Last-Modified", res)
+
+    @override_settings(CACHE_SHARED=False, RECIPE_LIST_CACHE=True)
+    def test_no_validators_without_shared_cache(self):
+        """Test lists aren't validated by versions other processes miss."""
+        res = self.client.get(RECIPES_URL)
+        create_recipe(user=self.user, title="Another")
+        res_changed = self.client.get(RECIPES_URL)
+
+        self.assertNotIn("ETag", res)
+        self.assertEqual(len(res_changed.json()["results"]), 2)
+
+    def test_matching_etag_not_modified(self):
+        """Test a matching ETag returns 304 without querying rows."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_etag_changes_after_write(self):
+        """Test writes to related objects invalidate the ETag."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        Tag.objects.create(user=self.user, name="New")
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
 
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_etag_differs_per_query(self):
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        res = self.client.get(RECIPES_URL, {"page_size": 1})
+
+        self.assertNotEqual(res["ETag"], etag)
+
+    @override_settings(RECIPE_LIST_CACHE=True)
+    def test_cached_list_served_without_queries(self):
+        """Test rendered lists are reused until the user's data changes."""
+        res = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            res_cached = self.client.get(RECIPES_URL)
+        create_recipe(user=self.user, title="Another")
+        res_changed = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res_cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(res_cached.content, res.content)
+        self.assertEqual(len(res_changed.json()["results"]), 2)
+
+
+def image_file(size=(10, 10), exif=None):
+    """Return a named temporary JPEG file of size."""
+    image_file = tempfile.NamedTemporaryFile(suffix=".jpg")
+    img = Image.new("RGB", size)
+    img.save(image_file, format="JPEG", exif=exif or Image.Exif())
+    image_file.seek(0)
+    return image_file
+
+
+@override_settings(TASKS_EAGER=True)
 class ImageUploadTests(TestCase):
     """Tests for the image uplaod API"""
     def setUp(self):
@@ -412,24 +988,371 @@ class ImageUploadTests(TestCase):
         self.recipe = create_recipe(user=self.user)
 
     def tearDown(self):
+        self.recipe.refresh_from_db()
+        storage = self.recipe.image.storage
+        if self.recipe.image:
+            for width in settings.RECIPE_IMAGE_RENDITIONS:
+                storage.delete(
+                    rendition_name(self.recipe.image.name, width)
+                )
         self.recipe.image.delete()
 
+    def upload(self, **kwargs):
+        """Upload an image and run its processing task."""
+        with image_file(**kwargs) as f:
+            with self.captureOnCommitCallbacks(execute=True):
+                return self.client.post(
+                    image_upload_url(self.recipe.id),
+                    {"image": f},
+                    format="multipart",
+                )
+
     def test_upload_image(self):
         """Test uploading an image to recipe"""
         url = image_upload_url(self.recipe.id)
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as image_file:
-            img = Image.new("RGB", (10, 10))
-            img.save(image_file, format="JPEG")
-            image_file.seek(0)
-            payload = {"image": image_file}
+        with image_file() as f:
+            payload = {"image": f}
             res = self.client.post(url, payload, format="multipart")
 
         self.recipe.refresh_from_db()
 
-        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
         self.assertIn("image", res.data)
+        self.assertEqual(res.data["image_status"], "pending")
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    def test_upload_image_processed_in_background(self):
+        """Test uploads get stripped and resized WebP variants."""
+        url = image_upload_url(self.recipe.id)
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise
+        exif[0x010F] = "Camera maker"
+        with image_file(size=(400, 300), exif=exif) as f:
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(url, {"image": f}, format="multipart")
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.recipe.image_status, "ready")
+        with Image.open(self.recipe.image.path) as original:
+            self.assertEqual(original.size, (300, 400))
+            self.assertEqual(dict(original.getexif()), {})
+        thumbnail = self.recipe.image_variants["thumbnail"]
+        with self.recipe.image.storage.open(thumbnail) as f:
+            with Image.open(f) as img:
+                self.assertEqual(img.format, "WEBP")
+                self.assertEqual(img.size, (200, 267))
+
+        detail = self.client.get(detail_url(self.recipe.id))
+        self.assertEqual(detail.data["image_status"], "ready")
+        self.assertTrue(
+            detail.data["image_variants"]["medium"].startswith("http")
+        )
+
+    def test_detail_lists_renditions(self):
+        """Test image URLs point at the authenticated image endpoint."""
+        self.upload(size=(1000, 500))
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.recipe.refresh_from_db()
+        version = os.path.splitext(os.path.basename(self.recipe.image.name))[0]
+        image_url = f"{image_url_for(self.recipe.id)}?v={version}"
+        renditions = res.data["image_renditions"]
+        widths = settings.RECIPE_IMAGE_RENDITIONS
+        self.assertTrue(res.data["image"].endswith(image_url))
+        self.assertEqual(list(renditions), [str(w) for w in widths])
+        self.assertTrue(renditions["400"].endswith(f"{image_url}&width=400"))
+        self.assertTrue(
+            res.data["image_variants"]["thumbnail"].endswith("&width=200")
+        )
+        self.assertIn(f"{renditions['800']} 800w", res.data["image_srcset"])
+
+    def test_image_urls_change_with_image(self):
+        """Test a new image is served under new URLs."""
+        self.upload(size=(1000, 500))
+        before = self.client.get(detail_url(self.recipe.id)).data
+
+        self.upload(size=(500, 1000))
+        after = self.client.get(detail_url(self.recipe.id)).data
+
+        self.assertNotEqual(after["image"], before["image"])
+        self.assertNotEqual(after["image_srcset"], before["image_srcset"])
+
+    def test_rendition_generated_on_first_request(self):
+        self.upload(size=(1000, 500))
+        self.recipe.refresh_from_db()
+        name = rendition_name(self.recipe.image.name, 400)
+
+        res = self.client.get(image_url_for(self.recipe.id), {"width": 400})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "image/webp")
+        with Image.open(io.BytesIO(b"".join(res.streaming_content))) as img:
+            self.assertEqual(img.size, (400, 200))
+        self.assertTrue(self.recipe.image.storage.exists(name))
+
+    @override_settings(CACHE_SHARED=False)
+    def test_rendition_deleted_elsewhere_regenerated(self):
+        """Test a per-process cache doesn't claim deleted renditions."""
+        self.upload(size=(1000, 500))
+        self.recipe.refresh_from_db()
+        name = rendition_name(self.recipe.image.name, 200)
+        # As another process would, without touching this one's cache.
+        self.recipe.image.storage.delete(name)
+
+        res = self.client.get(image_url_for(self.recipe.id), {"width": 200})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.recipe.image.storage.exists(name))
+
+    @override_settings(MEDIA_ACCEL_REDIRECT=True)
+    def test_image_handed_off_to_proxy(self):
+        """Test the proxy is told which file to send instead of the body."""
+        self.upload()
+        self.recipe.refresh_from_db()
+
+        res = self.client.get(image_url_for(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["X-Accel-Redirect"], self.recipe.image.url)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertIn("private", res["Cache-Control"])
+        self.assertEqual(res.content, b"")
+
+    def test_image_limited_to_owner(self):
+        self.upload()
+        other = create_user(email="other@example.com")
+        url = image_url_for(self.recipe.id)
+
+        self.client.force_authenticate(other)
+        res_other = self.client.get(url)
+        self.client.force_authenticate(None)
+        res_anonymous = self.client.get(url)
+
+        self.assertEqual(res_other.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            res_anonymous.status_code, status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_image_not_found(self):
+        no_image = self.client.get(image_url_for(self.recipe.id))
+        self.upload()
+        unknown_width = self.client.get(
+            image_url_for(self.recipe.id), {"width": 123}
+        )
+
+        self.assertEqual(no_image.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            unknown_width.status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_failed_processing_recorded(self):
+        url = image_upload_url(self.recipe.id)
+        with patch("recipe.images.render_variants", side_effect=OSError):
+            with image_file() as f, self.assertLogs("recipe.images"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.post(url, {"image": f}, format="multipart")
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, "failed")
+        self.assertEqual(self.recipe.image_variants, {})
+
+    def test_failed_encoding_keeps_original(self):
+        """Test the original is intact when re-encoding it fails."""
+        with image_file() as f:
+            content = f.read()
+        with patch("recipe.renditions.encode", side_effect=KeyError):
+            with self.assertLogs("recipe.images"):
+                self.upload()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, "failed")
+        with self.recipe.image.open("rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_failed_image_has_no_renditions(self):
+        """Test renditions are neither listed nor served for a bad image."""
+        content = io.BytesIO()
+        Image.effect_noise((200, 200), 64).convert("RGB").save(
+            content, "JPEG"
+        )
+        truncated = io.BytesIO(content.getvalue()[:content.tell() // 2])
+        truncated.name = "truncated.jpg"
+        with self.assertLogs("recipe.images"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    image_upload_url(self.recipe.id), {"image": truncated},
+                    format="multipart",
+                )
+
+        detail = self.client.get(detail_url(self.recipe.id))
+        res = self.client.get(image_url_for(self.recipe.id), {"width": 200})
+
+        self.assertEqual(detail.data["image_status"], "failed")
+        self.assertEqual(detail.data["image_renditions"], {})
+        self.assertEqual(detail.data["image_srcset"], "")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_undecodable_rendition_source_not_found(self):
+        """Test a stored image that can't be decoded isn't a server error."""
+        self.upload(size=(1000, 500))
+        self.recipe.refresh_from_db()
+        delete_renditions(self.recipe.image.name)
+        with open(self.recipe.image.path, "wb") as f:
+            f.write(b"not an image")
+
+        res = self.client.get(image_url_for(self.recipe.id), {"width": 400})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unexpected_processing_error_recorded(self):
+        """Test errors Pillow raises besides OSError also fail the image."""
+        with patch("recipe.images.render_variants", side_effect=KeyError):
+            with self.assertLogs("recipe.images"):
+                self.upload()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, "failed")
+
+    @override_settings(RECIPE_IMAGE_MAX_DIMENSION=50)
+    def test_upload_oversized_image_rejected(self):
+        """Test images too large in pixels are rejected before storing."""
+        res = self.upload(size=(60, 10))
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("50px", res.data["image"][0])
+        self.assertFalse(self.recipe.image)
+
+    def upload_to(self, recipe, **kwargs):
+        """Upload an image to another recipe and process it."""
+        with image_file(**kwargs) as f:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    image_upload_url(recipe.id), {"image": f},
+                    format="multipart",
+                )
+        recipe.refresh_from_db()
+
+    def test_processed_image_stored_by_its_own_hash(self):
+        """Test processing saves a new file instead of rewriting uploads."""
+        with image_file(size=(30, 20)) as f:
+            upload_digest = hashlib.sha256(f.read()).hexdigest()
+        self.upload(size=(30, 20))
+        self.recipe.refresh_from_db()
+
+        with self.recipe.image.open("rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        stem = os.path.splitext(os.path.basename(self.recipe.image.name))[0]
+        self.assertEqual(stem, digest)
+        self.assertNotEqual(stem, upload_digest)
+
+    def test_processed_upload_deleted(self):
+        """Test the original upload, with its metadata, is removed."""
+        with image_file(size=(30, 20)) as f:
+            upload_digest = hashlib.sha256(f.read()).hexdigest()
+        self.upload(size=(30, 20))
+        self.recipe.refresh_from_db()
+
+        upload = os.path.join(
+            os.path.dirname(self.recipe.image.name), f"{upload_digest}.jpg"
+        )
+        self.assertFalse(self.recipe.image.storage.exists(upload))
+
+    def test_upload_saved_again_while_processing_kept(self):
+        """Test an upload an identical upload is reusing isn't deleted."""
+        render_variants = images.render_variants
+        saved_again = []
+
+        def render_and_save_again(field_file):
+            with field_file.open("rb") as f:
+                saved_again.append(
+                    field_file.storage.save(field_file.name, f)
+                )
+            return render_variants(field_file)
+
+        with patch(
+            "recipe.images.render_variants", render_and_save_again
+        ):
+            self.upload(size=(30, 20))
+
+        self.assertTrue(self.recipe.image.storage.exists(saved_again[0]))
+
+    def test_identical_uploads_not_reprocessed(self):
+        """Test re-uploading a processed image leaves its file alone."""
+        self.upload(size=(30, 20))
+        self.recipe.refresh_from_db()
+        name = self.recipe.image.name
+        with self.recipe.image.open("rb") as f:
+            content = f.read()
+        other = create_recipe(user=self.user)
+
+        with patch("recipe.images.render_variants") as patched_render:
+            with self.recipe.image.open("rb") as f:
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.post(
+                        image_upload_url(other.id), {"image": f},
+                        format="multipart",
+                    )
+
+        other.refresh_from_db()
+        patched_render.assert_not_called()
+        self.assertEqual(other.image.name, name)
+        self.assertEqual(other.image_status, "ready")
+        self.assertEqual(other.image_variants, self.recipe.image_variants)
+        with self.recipe.image.open("rb") as f:
+            self.assertEqual(f.read(), content)
+
+    @override_settings(RECIPE_IMAGE_GC_MIN_AGE=-60)
+    def test_identical_uploads_share_file(self):
+        """Test an image stays until no recipe references it."""
+        other = create_recipe(user=self.user)
+        self.upload(size=(30, 20))
+        self.recipe.refresh_from_db()
+        name = self.recipe.image.name
+        thumbnail = self.recipe.image_variants["thumbnail"]
+        storage = self.recipe.image.storage
+
+        self.upload_to(other, size=(30, 20))
+        self.assertEqual(other.image.name, name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(detail_url(other.id))
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(size=(20, 30))
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(storage.exists(thumbnail))
+
+    def test_recent_image_not_released(self):
+        """Test a replaced image is left to GC while recently stored."""
+        self.upload(size=(30, 20))
+        self.recipe.refresh_from_db()
+        name = self.recipe.image.name
+        storage = self.recipe.image.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(size=(20, 30))
+
+        self.assertTrue(storage.exists(name))
+
+    def test_image_not_writable_through_detail(self):
+        """Test images can't bypass upload-image by updating the recipe."""
+        with image_file() as f:
+            res = self.client.patch(
+                detail_url(self.recipe.id),
+                {"title": "New title", "image": f},
+                format="multipart",
+            )
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.recipe.title, "New title")
+        self.assertFalse(self.recipe.image)
+        self.assertIsNone(res.data["image"])
+
     def test_upload_image_bad_request(self):
         """Test uploading invalid image."""
         url = image_upload_url(self.recipe.id)
@@ -4,7 +4,7 @@ Tests for tags API
 from decimal import Decimal
 
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -54,7 +54,7 @@ class PrivateTagsApiTests(TestCase):
         serializer = TagSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_tags_limited_to_user(self):
         user2 = create_user(email="other@example.com")
@@ -64,9 +64,9 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["name"], tag.name)
-        self.assertEqual(res.data[0]["id"], tag.id)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["name"], tag.name)
+        self.assertEqual(res.data["results"][0]["id"], tag.id)
 
     def test_update_tag(self):
         tag = Tag.objects.create(user=self.user, name="After Dinner")
@@ -79,6 +79,15 @@ class PrivateTagsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(tag.name, payload["name"])
 
+    def test_update_tag_duplicate_name(self):
+        """Test renaming a tag to an existing name fails."""
+        Tag.objects.create(user=self.user, name="Lunch")
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+
+        res = self.client.patch(detail_url(tag.id), {"name": "Lunch"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_delete_tag(self):
         tag = Tag.objects.create(user=self.user, name="Breakfast")
 
@@ -105,8 +114,8 @@ class PrivateTagsApiTests(TestCase):
         s2 = TagSerializer(tag2)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertNotIn(s2.data, res.data["results"])
 
     def test_filtered_tags_unique(self):
         """Test filtered tags doesn't return duplicates."""
@@ -129,4 +138,28 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_tags_paginated_by_name(self):
+        """Test tags are paged by name with a cursor."""
+        for name in ["A", "B", "C"]:
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(TAGS_URL, {"page_size": 2})
+        res_next = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            [t["name"] for t in res.data["results"]], ["C", "B"]
+        )
+        self.assertEqual([t["name"] for t in res_next.data["results"]], ["A"])
+        self.assertIsNone(res_next.data["next"])
+
+    @override_settings(CACHE_SHARED=True)
+    def test_tags_not_modified(self):
+        """Test a matching ETag returns 304 for tags."""
+        Tag.objects.create(user=self.user, name="Vegan")
+        etag = self.client.get(TAGS_URL)["ETag"]
+
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
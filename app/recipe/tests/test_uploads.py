@@ -0,0 +1,87 @@
+"""
+Tests for the recipe image upload handler
+"""
+import io
+
+from django.core.files.uploadhandler import SkipFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from recipe.uploads import ImageUploadHandler
+
+
+def image_bytes(size, fmt="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def chunks(data, size=64):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@override_settings(
+    RECIPE_IMAGE_MAX_UPLOAD_SIZE=10000,
+    RECIPE_IMAGE_MAX_DIMENSION=100,
+    RECIPE_IMAGE_MAX_PIXELS=5000,
+)
+class ImageUploadHandlerTests(SimpleTestCase):
+    """Tests for ImageUploadHandler."""
+
+    def setUp(self):
+        self.handler = ImageUploadHandler()
+        self.handler.new_file("image", "upload.png", "image/png", None)
+
+    def tearDown(self):
+        self.handler.upload_interrupted()
+
+    def feed(self, data):
+        """Feed data in chunks, returning how many were accepted."""
+        start = 0
+        for count, chunk in enumerate(chunks(data)):
+            try:
+                self.handler.receive_data_chunk(chunk, start)
+            except SkipFile:
+                return count
+            start += len(chunk)
+        return len(chunks(data))
+
+    def test_valid_image_streamed_to_file(self):
+        data = image_bytes((50, 50))
+
+        accepted = self.feed(data)
+        upload = self.handler.file_complete(len(data))
+
+        self.assertEqual(accepted, len(chunks(data)))
+        self.assertIsNone(self.handler.error)
+        self.assertIsNone(self.handler.header)
+        self.assertEqual(upload.read(), data)
+
+    def test_oversized_dimensions_rejected_from_header(self):
+        data = image_bytes((101, 10)) + b"\0" * 1000
+
+        accepted = self.feed(data)
+
+        self.assertLess(accepted, 2)
+        self.assertIn("100px", self.handler.error)
+
+    def test_too_many_pixels_rejected(self):
+        self.feed(image_bytes((100, 100)))
+
+        self.assertIn("5000 pixels", self.handler.error)
+
+    def test_too_large_file_rejected(self):
+        data = image_bytes((10, 10)) + b"\0" * 10000
+
+        accepted = self.feed(data)
+
+        self.assertEqual(accepted, 10000 // 64)
+        self.assertIn("Image must not exceed", self.handler.error)
+
+    def test_unreadable_header_rejected(self):
+        self.handler.header_limit = 256
+
+        accepted = self.feed(b"not an image" * 100)
+
+        self.assertEqual(accepted, 3)
+        self.assertEqual(self.handler.error, "Upload a valid image.")
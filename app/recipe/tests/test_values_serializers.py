@@ -0,0 +1,91 @@
+"""
+Tests for values() based read serializers
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework import serializers as drf_serializers
+
+from core.models import Recipe, Tag, Ingredient
+from core.utils import create_user
+from recipe import serializers
+from recipe.values_serializers import get_values_serializer
+
+
+def render(serializer_class, queryset):
+    values_serializer = get_values_serializer(serializer_class)
+    return values_serializer.serialize(values_serializer.values(queryset))
+
+
+class ValuesSerializerTests(TestCase):
+    """Test output parity with the model serializers."""
+
+    def setUp(self):
+        self.user = create_user("user@example.com", "testpass123")
+        other = create_user("other@example.com", "testpass123")
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Curry",
+            time_minutes=30,
+            price=Decimal("5.5"),
+            link="https://example.com/curry.pdf",
+        )
+        Recipe.objects.create(
+            user=other, title="Bare", time_minutes=1, price=Decimal("0.10")
+        )
+        for name in ["Spicy", "Dinner"]:
+            self.recipe.tags.add(Tag.objects.create(user=self.user, name=name))
+        self.recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name="Rice")
+        )
+
+    def assert_parity(self, serializer_class, queryset):
+        expected = serializer_class(queryset, many=True).data
+
+        self.assertEqual(render(serializer_class, queryset), expected)
+
+    def test_recipe_parity(self):
+        self.assert_parity(
+            serializers.RecipeSerializer, Recipe.objects.order_by("-id")
+        )
+
+    def test_tag_parity(self):
+        self.assert_parity(serializers.TagSerializer, Tag.objects.all())
+
+    def test_ingredient_parity(self):
+        self.assert_parity(
+            serializers.IngredientSerializer, Ingredient.objects.all()
+        )
+
+    def test_field_order_preserved(self):
+        rendered = render(
+            serializers.RecipeSerializer,
+            Recipe.objects.filter(id=self.recipe.id),
+        )
+
+        self.assertEqual(
+            list(rendered[0]), serializers.RecipeSerializer.Meta.fields
+        )
+
+    def test_nested_queries_constant(self):
+        """Test nested relations load with one query each."""
+        values_serializer = get_values_serializer(serializers.RecipeSerializer)
+        rows = values_serializer.values(Recipe.objects.all())
+
+        with self.assertNumQueries(3):
+            values_serializer.serialize(rows)
+
+    def test_unsupported_serializer(self):
+        """Test serializers with file fields aren't compiled."""
+        self.assertIsNone(
+            get_values_serializer(serializers.RecipeDetailSerializer)
+        )
+
+        class MethodSerializer(drf_serializers.ModelSerializer):
+            label = drf_serializers.SerializerMethodField()
+
+            class Meta:
+                model = Tag
+                fields = ["id", "label"]
+
+        self.assertIsNone(get_values_serializer(MethodSerializer))
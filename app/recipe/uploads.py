@@ -0,0 +1,72 @@
+"""
+Upload handling for recipe images.
+"""
+import io
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    SkipFile,
+    TemporaryFileUploadHandler,
+)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream image uploads to a temporary file, checking them on the way.
+
+    The first chunks are also kept until Pillow can read the image header
+    from them, without decoding any pixels. Files that are too large, too
+    big in pixels or whose header can't be read within header_limit bytes
+    are skipped as soon as that's known, and the reason is kept in error.
+    """
+    header_limit = 256 * 1024
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.error = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.header = bytearray()
+        self.checked = False
+
+    def _reject(self, message):
+        self.error = message
+        raise SkipFile(message)
+
+    def _check_header(self):
+        try:
+            with Image.open(io.BytesIO(self.header)) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            width = height = settings.RECIPE_IMAGE_MAX_DIMENSION + 1
+        except (OSError, ValueError):
+            if len(self.header) >= self.header_limit:
+                self._reject("Upload a valid image.")
+            return
+
+        self.checked = True
+        self.header = None
+        max_dimension = settings.RECIPE_IMAGE_MAX_DIMENSION
+        if max(width, height) > max_dimension:
+            self._reject(
+                f"Image dimensions must not exceed {max_dimension}px."
+            )
+        if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            self._reject(
+                f"Image must not exceed "
+                f"{settings.RECIPE_IMAGE_MAX_PIXELS} pixels."
+            )
+
+    def receive_data_chunk(self, raw_data, start):
+        max_size = settings.RECIPE_IMAGE_MAX_UPLOAD_SIZE
+        if start + len(raw_data) > max_size:
+            self._reject(
+                f"Image must not exceed {filesizeformat(max_size)}."
+            )
+        if not self.checked:
+            self.header += raw_data
+            self._check_header()
+        return super().receive_data_chunk(raw_data, start)
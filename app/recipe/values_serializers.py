@@ -0,0 +1,123 @@
+"""
+Read-only serialization straight from values() rows.
+
+A ValuesSerializer is compiled once per serializer class from that
+class's fields. It renders plain fields with the same field objects the
+ModelSerializer would use and loads nested many-to-many serializers with
+one query on the through table. That skips model instantiation and
+per-instance serializer overhead for large list responses.
+"""
+from functools import lru_cache
+
+from rest_framework import serializers
+
+
+UNSUPPORTED = (
+    serializers.Serializer,
+    serializers.FileField,
+    serializers.RelatedField,
+    serializers.ManyRelatedField,
+)
+
+
+class UnsupportedField(Exception):
+    """Raised when a serializer can't be rendered from values() rows."""
+
+
+def _lookup(source):
+    return source.replace(".", "__")
+
+
+class ValuesSerializer:
+    """Render querysets of serializer_class's model as plain dicts."""
+
+    def __init__(self, serializer_class):
+        self.model = serializer_class.Meta.model
+        self.pk = self.model._meta.pk.attname
+        self.fields = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                self.fields.append((name, self._compile_nested(field), None))
+            elif isinstance(field, UNSUPPORTED) or field.source == "*":
+                raise UnsupportedField(name)
+            else:
+                self.fields.append(
+                    (name, _lookup(field.source), field.to_representation)
+                )
+
+    def _compile_nested(self, field):
+        child = ValuesSerializer(type(field.child))
+        if any(to_rep is None for _, _, to_rep in child.fields):
+            raise UnsupportedField(field.field_name)
+        relation = self.model._meta.get_field(field.source)
+        if not relation.many_to_many or relation.auto_created:
+            raise UnsupportedField(field.field_name)
+        return (relation, child)
+
+    def lookups(self):
+        """Return the values() lookups needed to render rows."""
+        lookups = [self.pk]
+        for _, source, to_rep in self.fields:
+            if to_rep is not None and source not in lookups:
+                lookups.append(source)
+        return lookups
+
+    def values(self, queryset, *extra):
+        """Turn queryset into a values() queryset this serializer renders."""
+        lookups = self.lookups()
+        lookups += [lookup for lookup in extra if lookup not in lookups]
+        return queryset.prefetch_related(None).values(*lookups)
+
+    def _load_nested(self, relation, child, ids):
+        """Map each parent id to its rendered related objects."""
+        through = relation.remote_field.through
+        parent = relation.m2m_field_name()
+        target = relation.m2m_reverse_field_name()
+        rows = through.objects.filter(
+            **{f"{parent}_id__in": ids}
+        ).order_by("pk").values(
+            f"{parent}_id",
+            *[f"{target}__{lookup}" for lookup in child.lookups()],
+        )
+        nested = {}
+        for row in rows:
+            item = {
+                lookup: row[f"{target}__{lookup}"]
+                for lookup in child.lookups()
+            }
+            nested.setdefault(row[f"{parent}_id"], []).append(
+                child.to_representation(item)
+            )
+        return nested
+
+    def to_representation(self, row, nested=None):
+        ret = {}
+        for name, source, to_rep in self.fields:
+            if to_rep is None:
+                ret[name] = nested[name].get(row[self.pk], [])
+                continue
+            value = row[source]
+            ret[name] = None if value is None else to_rep(value)
+        return ret
+
+    def serialize(self, rows):
+        """Render values() rows, loading nested relations in bulk."""
+        rows = list(rows)
+        ids = [row[self.pk] for row in rows]
+        nested = {
+            name: self._load_nested(*source, ids) if ids else {}
+            for name, source, to_rep in self.fields
+            if to_rep is None
+        }
+        return [self.to_representation(row, nested) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_values_serializer(serializer_class):
+    """Return a compiled ValuesSerializer, or None if unsupported."""
+    try:
+        return ValuesSerializer(serializer_class)
+    except UnsupportedField:
+        return None
@@ -1,20 +1,33 @@
 """
 Views for recipe APIs
 """
+from django.conf import settings
+from django.http import Http404
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
     OpenApiParameter,
     OpenApiTypes,
 )
+from PIL import Image
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
+from core.media import media_response
 from core.models import Recipe, Tag, Ingredient
-from recipe import serializers
+from user.authentication import CachedTokenAuthentication
+from recipe import filters, renditions, serializers
+from recipe.images import queue_recipe_image
+from recipe.mixins import ConditionalListMixin, ValuesListMixin
+from recipe.pagination import (
+    RecipeCursorPagination,
+    RecipeAttrCursorPagination,
+)
+from recipe.prefetch import prefetch_for_serializer
+from recipe.uploads import ImageUploadHandler
 
 
 @extend_schema_view(
@@ -30,18 +43,72 @@ from recipe import serializers
                 OpenApiTypes.STR,
                 description="Comma separated list of ingredient IDs to filter by.",
             ),
+            OpenApiParameter(
+                "match",
+                OpenApiTypes.STR,
+                enum=[filters.MATCH_ANY, filters.MATCH_ALL],
+                description="Match recipes with any (default) or all of "
+                            "the given tags/ingredients.",
+            ),
+            OpenApiParameter(
+                "search",
+                OpenApiTypes.STR,
+                description="Search titles and descriptions. Results are "
+                            "ordered by relevance.",
+            ),
+            OpenApiParameter(
+                "search_mode",
+                OpenApiTypes.STR,
+                enum=[filters.SEARCH_FULLTEXT, filters.SEARCH_FUZZY],
+                description="Full-text search (default) or fuzzy title "
+                            "matching by trigram similarity.",
+            ),
+            OpenApiParameter(
+                "min_time",
+                OpenApiTypes.INT,
+                description="Minimum preparation time in minutes.",
+            ),
+            OpenApiParameter(
+                "max_time",
+                OpenApiTypes.INT,
+                description="Maximum preparation time in minutes.",
+            ),
+            OpenApiParameter(
+                "min_price",
+                OpenApiTypes.DECIMAL,
+                description="Minimum price.",
+            ),
+            OpenApiParameter(
+                "max_price",
+                OpenApiTypes.DECIMAL,
+                description="Maximum price.",
+            ),
+            OpenApiParameter(
+                "ordering",
+                OpenApiTypes.STR,
+                enum=list(filters.ORDERINGS),
+                description="Order by preparation time or price. Newest "
+                            "first (or by relevance when searching) if "
+                            "not given.",
+            ),
         ]
     )
 )
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ConditionalListMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """
     View for manage recipe APIs.
     """
 
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+    prefetch_actions = ("list", "retrieve")
 
     def _params_to_ints(self, qs):
         """Convert a list of strings to ints."""
@@ -53,14 +120,46 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ingredients = self.request.query_params.get("ingredients")
         queryset = self.queryset
 
+        params = {}
+        if self.action == "list":
+            serializer = filters.RecipeFilterSerializer(
+                data=self.request.query_params
+            )
+            serializer.is_valid(raise_exception=True)
+            params = serializer.validated_data
+        match = params.get("match", filters.MATCH_ANY)
+
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = filters.filter_recipes_by_related(
+                queryset, "tags", tag_ids, match
+            )
         if ingredients:
-            tag_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=tag_ids)
+            ingredient_ids = self._params_to_ints(ingredients)
+            queryset = filters.filter_recipes_by_related(
+                queryset, "ingredients", ingredient_ids, match
+            )
+
+        ordering = ("-id",)
+        if self.action == "list":
+            queryset = filters.filter_recipes_by_range(queryset, params)
+
+            search = params.get("search")
+            if search:
+                queryset = filters.search_recipes(
+                    queryset, search, params["search_mode"]
+                )
+                ordering = filters.SEARCH_ORDERING
+            if "ordering" in params:
+                ordering = filters.ORDERINGS[params["ordering"]]
+            self.paginator.ordering = ordering
+
+        if self.action in self.prefetch_actions:
+            queryset = prefetch_for_serializer(
+                queryset, self.get_serializer_class()
+            )
 
-        return queryset.filter(user=self.request.user).order_by("-id").distinct()
+        return queryset.filter(user=self.request.user).order_by(*ordering)
 
     def get_serializer_class(self):
         """Return Serializer class for request."""
@@ -76,13 +175,86 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     @action(methods=["POST"], detail=True, url_path="upload-image")
     def upload_image(self, request, pk=None):
-        """Upload an image to recipe."""
+        """Upload an image to recipe and queue it for processing."""
+        # Stream the upload to a temporary file whatever its size, so
+        # storing it is a rename rather than a copy out of memory.
+        upload_handler = ImageUploadHandler(request)
+        request.upload_handlers = [upload_handler]
         recipe = self.get_object()
-        serializer = self.get_serializer(recipe, data=request.data)
+        data = request.data
+        if upload_handler.error:
+            return Response(
+                {"image": [upload_handler.error]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(recipe, data=data)
 
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            queue_recipe_image(recipe)
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "width",
+                OpenApiTypes.INT,
+                enum=settings.RECIPE_IMAGE_RENDITIONS,
+                description="Serve a WebP rendition of this width instead "
+                            "of the original.",
+            ),
+        ],
+        responses={(200, "image/*"): OpenApiTypes.BINARY},
+    )
+    @action(methods=["GET"], detail=True, url_path="image")
+    def image(self, request, pk=None):
+        """Serve the recipe's image, or a rendition of it."""
+        recipe = self.get_object()
+        if not recipe.image:
+            raise Http404("Recipe has no image.")
+
+        name = recipe.image.name
+        width = request.query_params.get("width")
+        if width is not None:
+            if width not in map(str, settings.RECIPE_IMAGE_RENDITIONS):
+                raise ValidationError({"width": ["Unknown rendition width."]})
+            # Only processed images have been decoded successfully and
+            # checked, so only they are decoded here.
+            if recipe.image_status != Recipe.ImageStatus.READY:
+                raise Http404("Image has no renditions.")
+            try:
+                name = renditions.get_rendition(name, int(width))
+            except FileNotFoundError:
+                raise Http404("Image file is missing.")
+            # UnidentifiedImageError and truncated files are OSErrors.
+            except (OSError, Image.DecompressionBombError):
+                raise Http404("Image file can't be decoded.")
+
+        return media_response(recipe.image.storage, name)
+
+    @extend_schema(
+        request=serializers.RecipeDetailSerializer(many=True),
+        responses=serializers.RecipeDetailSerializer(many=True),
+    )
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        """Create many recipes in one transaction."""
+        max_items = settings.RECIPE_BULK_MAX_ITEMS
+        if isinstance(request.data, list) and len(request.data) > max_items:
+            msg = f"At most {max_items} recipes allowed."
+            return Response(
+                {"non_field_errors": [msg]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(data=request.data, many=True)
+
+        if serializer.is_valid():
+            serializer.save(user=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -100,21 +272,26 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
 )
 class BaseRecipeAttrViewSet(
+    ConditionalListMixin,
+    ValuesListMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
 ):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeAttrCursorPagination
 
     def get_queryset(self):
         """Filter queryset to authed user."""
         assigned_only = bool(int(self.request.query_params.get("assigned_only", 0)))
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
-        return queryset.filter(user=self.request.user).order_by("-name").distinct()
+            queryset = filters.filter_assigned(queryset)
+        return queryset.filter(user=self.request.user).order_by(
+            "-name", "-id"
+        )
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
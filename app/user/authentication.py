@@ -0,0 +1,150 @@
+"""
+Cached token authentication for the APIs.
+
+Tokens are looked up in a small per-process LRU first, then in the shared
+cache and only then in the database. Only the token's user id and
+whether the user is active are cached, never the key or user fields such
+as the password hash, and request.user is built with all other fields
+deferred, to be loaded if used.
+
+Entries are dropped from both tiers when a token is deleted or its user
+is saved. Other processes only drop their local copy when it expires, so
+a deleted token or deactivated user keeps authenticating in them for up
+to TOKEN_CACHE_LOCAL_TIMEOUT seconds.
+
+Without a shared cache (see CACHE_SHARED) nothing is cached, since
+other processes would never see the invalidations.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext as _t
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from core.cache import get_cached, metrics
+
+
+class LocalLRUCache:
+    """Thread-safe in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalLRUCache(settings.TOKEN_CACHE_LOCAL_SIZE)
+
+
+def _shared_cache():
+    return caches[settings.TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(key):
+    """Return the cache key for a token without exposing the token."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"auth:token:{digest}"
+
+
+def invalidate_tokens(keys):
+    """Drop the given token keys from both cache tiers."""
+    cache_keys = [token_cache_key(key) for key in keys]
+    for cache_key in cache_keys:
+        local_cache.delete(cache_key)
+    if cache_keys:
+        _shared_cache().delete_many(cache_keys)
+
+
+def _from_db(model, **values):
+    """Return a model instance with only values loaded, as from the DB."""
+    names = [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in values
+    ]
+    return model.from_db(
+        router.db_for_read(model), names, [values[name] for name in names]
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication backed by a local and a shared cache."""
+
+    def _fetch_state(self, key):
+        """Return (user id, user is active) of the token key."""
+        state = Token.objects.filter(key=key).values_list(
+            "user_id", "user__is_active"
+        ).first()
+        if state is None:
+            raise exceptions.AuthenticationFailed(_t("Invalid token."))
+        return state
+
+    def _load_state(self, key):
+        if not settings.CACHE_SHARED:
+            return self._fetch_state(key)
+
+        cache_key = token_cache_key(key)
+        state = local_cache.get(cache_key)
+        metrics.record(
+            "auth-token-local", "hits" if state is not None else "misses"
+        )
+        if state is None:
+            state = get_cached(
+                cache_key, "auth-token", alias=settings.TOKEN_CACHE_ALIAS
+            )
+            if state is None:
+                state = self._fetch_state(key)
+                _shared_cache().set(
+                    cache_key, state, settings.TOKEN_CACHE_TIMEOUT
+                )
+            local_cache.set(
+                cache_key, state, settings.TOKEN_CACHE_LOCAL_TIMEOUT
+            )
+        return state
+
+    def authenticate_credentials(self, key):
+        user_id, is_active = self._load_state(key)
+
+        if not is_active:
+            raise exceptions.AuthenticationFailed(
+                _t("User inactive or deleted.")
+            )
+
+        user = _from_db(get_user_model(), id=user_id, is_active=is_active)
+        token = _from_db(Token, key=key, user_id=user_id)
+        token.user = user
+        return (user, token)
@@ -0,0 +1,35 @@
+"""
+Signal handlers for the user app.
+"""
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import invalidate_tokens
+
+
+# Invalidation waits for the transaction to commit. Done earlier, a
+# concurrent request could still read and cache the old rows.
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Forget a token once its deletion is committed."""
+    transaction.on_commit(partial(invalidate_tokens, [instance.key]))
+
+
+def _invalidate_tokens_of(user_id):
+    keys = Token.objects.filter(user_id=user_id).values_list("key", flat=True)
+    invalidate_tokens(list(keys))
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Forget cached tokens of a user whose state changed."""
+    if created:
+        return
+    transaction.on_commit(partial(_invalidate_tokens_of, instance.pk))
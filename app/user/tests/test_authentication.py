@@ -0,0 +1,183 @@
+"""
+Tests for cached token authentication
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import cache as core_cache
+from core.utils import create_user
+from user.authentication import (
+    CachedTokenAuthentication,
+    local_cache,
+    token_cache_key,
+)
+
+
+ME_URL = reverse("user:me")
+
+
+@override_settings(CACHE_SHARED=True)
+class CachedTokenAuthenticationTests(TestCase):
+    """Tests for CachedTokenAuthentication."""
+
+    def setUp(self):
+        local_cache.clear()
+        cache.clear()
+        self.user = create_user("user@example.com", "testpass123")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_token_lookup_cached(self):
+        """Test the token is only read from the DB once."""
+        with self.assertNumQueries(2):
+            res = self.client.get(ME_URL)
+        with self.assertNumQueries(1):
+            res_cached = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res_cached.data, res.data)
+
+    def test_shared_cache_used_when_local_empty(self):
+        """Test a cold local cache is filled from the shared cache."""
+        self.client.get(ME_URL)
+        local_cache.clear()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_cache_reads_recorded(self):
+        """Test token lookups count hits and misses of both tiers."""
+        core_cache.metrics.reset()
+        self.client.get(ME_URL)
+        self.client.get(ME_URL)
+
+        stats = core_cache.metrics.snapshot()
+        self.assertEqual(stats["auth-token-local"], {"hits": 1, "misses": 1})
+        self.assertEqual(stats["auth-token"], {"hits": 0, "misses": 1})
+
+    def test_cached_state_has_no_secrets(self):
+        """Test only the user id and active flag are cached."""
+        self.client.get(ME_URL)
+
+        cache_key = token_cache_key(self.token.key)
+        self.assertEqual(cache.get(cache_key), (self.user.id, True))
+        self.assertEqual(local_cache.get(cache_key), (self.user.id, True))
+
+    def test_authenticated_user_loads_fields_on_use(self):
+        """Test the deferred user loads fields and saves without them."""
+        auth = CachedTokenAuthentication()
+        user, token = auth.authenticate_credentials(self.token.key)
+
+        self.assertEqual(user.email, "user@example.com")
+        self.assertEqual(token.user_id, self.user.id)
+        user.name = "New Name"
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, "New Name")
+        self.assertTrue(self.user.check_password("testpass123"))
+
+    def test_invalid_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_invalidated(self):
+        """Test deleting a token stops it authenticating."""
+        self.client.get(ME_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_invalidated(self):
+        """Test deactivating a user stops their token authenticating."""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_update_refreshes_cache(self):
+        """Test changes to the user are visible on the next request."""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"name": "New Name"})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["name"], "New Name")
+
+    def test_update_starts_from_current_user(self):
+        """Test updates don't write back a stale cached user."""
+        self.client.get(ME_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+
+        self.client.patch(ME_URL, {"name": "New Name"})
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+
+    def test_invalidated_on_commit(self):
+        """Test cached tokens are only dropped once the change commits."""
+        self.client.get(ME_URL)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.is_active = False
+            self.user.save()
+            local_cache.clear()
+            self.assertEqual(
+                self.client.get(ME_URL).status_code, status.HTTP_200_OK
+            )
+
+        for callback in callbacks:
+            callback()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(CACHE_SHARED=False)
+class UnsharedCacheTokenAuthenticationTests(TestCase):
+    """Tests for CachedTokenAuthentication with a per-process cache."""
+
+    def setUp(self):
+        local_cache.clear()
+        cache.clear()
+        self.user = create_user("user@example.com", "testpass123")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_token_not_cached(self):
+        """Test every request reads the token from the DB."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_rejected_without_invalidation(self):
+        """Test deleted tokens fail even when no invalidation runs."""
+        self.client.get(ME_URL)
+        Token.objects.filter(key=self.token.key).delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
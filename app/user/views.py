@@ -1,10 +1,12 @@
 """
 Views for USER API
 """
-from rest_framework import generics, authentication, permissions
+from django.contrib.auth import get_user_model
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from user.authentication import CachedTokenAuthentication
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -16,12 +18,14 @@ class CreateUserView(generics.CreateAPIView):
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authed user"""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return the authed user."""
-        return self.request.user
+        # request.user may come from the token cache. Updates save every
+        # column, so they must start from the current row.
+        return get_user_model().objects.get(pk=self.request.user.pk)
 
 
 class CreateTokenView(ObtainAuthToken):
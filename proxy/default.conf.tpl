@@ -5,9 +5,15 @@ server {
         alias /vol/static;
     }
 
+    # Media is only served once the app has checked access and answered
+    # with X-Accel-Redirect to a URL in here.
+    location /static/media/ {
+        internal;
+        alias /vol/static/media/;
+    }
+
     location / {
-        uwsgi_pass              ${APP_HOST}:${APP_PORT};
-        include                 /etc/nginx/uwsgi_params;
+        include                 /etc/nginx/app_pass.conf;
         client_max_body_size    10M;
     }
 }
\ No newline at end of file
@@ -3,4 +3,6 @@
 set -e
 
 envsubst < /etc/nginx/default.conf.tpl > /etc/nginx/conf.d/default.conf
+envsubst '${APP_HOST} ${APP_PORT}' \
+    < /etc/nginx/${APP_SERVER}_pass.conf.tpl > /etc/nginx/app_pass.conf
 nginx -g 'daemon off;'
@@ -2,7 +2,58 @@
 
 set -e
 
-python manage.py wait_for_db
-python manage.py collectstatic --noinput
-python manage.py migrate
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
\ No newline at end of file
+python manage.py prepare_app
+
+# Run a manage.py command now and then every $1 seconds in the
+# background, unless $1 is 0.
+every() {
+    interval=$1
+    shift
+    if [ "$interval" -gt 0 ]; then
+        while true; do
+            python manage.py "$@" || true
+            sleep "$interval"
+        done &
+    fi
+}
+
+# Image processing runs on each worker's thread pool, so tasks are lost
+# when a worker is killed or recycled. Images they left pending or
+# processing are picked up every APP_JOBS_INTERVAL seconds, starting
+# now for those left by the last run. Images that were still recent
+# when released are deleted every APP_GC_INTERVAL seconds.
+export APP_JOBS_INTERVAL=${APP_JOBS_INTERVAL:-300}
+export APP_GC_INTERVAL=${APP_GC_INTERVAL:-3600}
+every "$APP_JOBS_INTERVAL" process_recipe_images
+every "$APP_GC_INTERVAL" gc_recipe_images
+
+# App server profile, see scripts/uwsgi.ini for measurements. Workers
+# default to two per CPU core, each serving APP_THREADS requests at a
+# time, so requests waiting on the database don't leave cores idle.
+# APP_LAZY_APPS=true imports the app in every worker instead of once
+# before forking. Workers are recycled after about APP_MAX_REQUESTS
+# requests and requests running longer than APP_TIMEOUT seconds are
+# killed.
+export APP_WORKERS=${APP_WORKERS:-$(( $(nproc) * 2 ))}
+export APP_THREADS=${APP_THREADS:-4}
+export APP_LAZY_APPS=${APP_LAZY_APPS:-false}
+export APP_BACKLOG=${APP_BACKLOG:-128}
+export APP_MAX_REQUESTS=${APP_MAX_REQUESTS:-5000}
+export APP_MAX_REQUESTS_JITTER=${APP_MAX_REQUESTS_JITTER:-500}
+export APP_TIMEOUT=${APP_TIMEOUT:-30}
+
+if [ "${APP_SERVER:-uwsgi}" = "asgi" ]; then
+    if [ "$APP_LAZY_APPS" != "true" ]; then
+        set -- --preload
+    fi
+    gunicorn app.asgi:application "$@" \
+        --worker-class uvicorn.workers.UvicornWorker \
+        --workers $APP_WORKERS \
+        --backlog $APP_BACKLOG \
+        --max-requests $APP_MAX_REQUESTS \
+        --max-requests-jitter $APP_MAX_REQUESTS_JITTER \
+        --timeout $APP_TIMEOUT \
+        --bind :9000
+else
+    uwsgi --ini /scripts/uwsgi.ini --listen $APP_BACKLOG
+fi